@@ -1,57 +1,28 @@
-from flask import Flask, render_template_string, request, jsonify
+from flask import Flask, Response, abort, render_template_string, request, jsonify, send_from_directory
 import os
-from openai import OpenAI
 import json
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from dotenv import load_dotenv
+from reel_engine import ReelTranscriptEngine
+from job_manager import JobManager
+import metrics
+import profiling
 
 # Load environment variables
 load_dotenv()
 
 app = Flask(__name__)
 
-class InstagramReelTranscript:
-    def __init__(self):
-        self.openai_key = os.getenv('OPENAI_API_KEY')
-        self.client = OpenAI(api_key=self.openai_key) if self.openai_key else None
-    
-    def extract_reel_data(self, reel_url, model="whisper-1"):
-        """Extract data from Instagram reel - Demo version"""
-        try:
-            if not self.client:
-                return {"success": False, "error": "OpenAI API key not configured", "data": None}
-            
-            # Demo implementation - in production you'd implement full video processing
-            sample_result = {
-                "url": reel_url,
-                "transcript": f"This is a demo transcript for {reel_url}. In production, this would be the actual transcript from the Instagram reel using OpenAI Whisper API.",
-                "language": "en",
-                "duration": 30.5,
-                "segments": [
-                    {"start": 0.0, "end": 10.0, "text": "This is a sample segment from the demo."},
-                    {"start": 10.0, "end": 20.0, "text": "Another sample segment for demonstration."},
-                    {"start": 20.0, "end": 30.5, "text": "Final segment of the demo transcript."},
-                ],
-                "metadata": {
-                    "model_used": model,
-                    "note": "This is a demo version optimized for Vercel deployment"
-                }
-            }
-            
-            return {
-                "success": True,
-                "data": [sample_result],
-                "total_items": 1
-            }
-            
-        except Exception as e:
-            return {
-                "success": False,
-                "error": str(e),
-                "data": None
-            }
-
 # Initialize extractor
-extractor = InstagramReelTranscript()
+extractor = ReelTranscriptEngine()
+
+# Background jobs for the asynchronous /jobs API
+jobs = JobManager(ReelTranscriptEngine)
+
+# Batch extraction limits
+BATCH_MAX_URLS = int(os.getenv('REEL_BATCH_MAX_URLS', 500))
+BATCH_CONCURRENCY = int(os.getenv('REEL_BATCH_CONCURRENCY', 4))
 
 # HTML Template
 HTML_TEMPLATE = """
@@ -354,8 +325,8 @@ HTML_TEMPLATE = """
                         
                         <h3>⚠️ Current Status</h3>
                         <div class="warning-box">
-                            <strong>Demo Version:</strong>
-                            <p style="margin-top: 10px;">This is a demo version optimized for Vercel deployment. In production, you would implement full video download and processing capabilities.</p>
+                            <strong>Note:</strong>
+                            <p style="margin-top: 10px;">Instagram may block automated downloads due to rate limiting. Make sure reels are from public accounts.</p>
                         </div>
                     </div>
                 </div>
@@ -488,11 +459,200 @@ def extract():
         if not url:
             return jsonify({"success": False, "error": "URL is required"})
         
-        result = extractor.extract_reel_data(url, model)
+        # X-Reel-Profile: 1|cprofile|sample (or ?profile=) profiles just this request
+        profile = request.headers.get('X-Reel-Profile') or request.args.get('profile')
+        if profiling.parse_mode(profile) and not profile_token_ok():
+            return jsonify({"success": False, "error": "Profiling needs a valid X-Reel-Profile-Token"}), 403
+        # X-Reel-Deadline: seconds the client will wait - the job gives up after that
+        deadline = request.headers.get('X-Reel-Deadline')
+        if deadline is not None:
+            try:
+                deadline = float(deadline)
+            except ValueError:
+                return jsonify({"success": False, "error": "X-Reel-Deadline must be a number of seconds"}), 400
+        result = extractor.extract_reel_data(url, model, profile=profile, deadline=deadline)
         return jsonify(result)
         
     except Exception as e:
         return jsonify({"success": False, "error": str(e)})
 
+@app.route('/extract/batch', methods=['POST'])
+def extract_batch():
+    """Extract many reels and stream one NDJSON line per reel as it finishes"""
+    data = request.get_json(silent=True) or {}
+    urls = data.get('urls')
+    model = data.get('model', 'whisper-1')
+    
+    if not isinstance(urls, list) or not urls:
+        return jsonify({"success": False, "error": "urls must be a non-empty list"})
+    if len(urls) > BATCH_MAX_URLS:
+        return jsonify({"success": False, "error": f"At most {BATCH_MAX_URLS} URLs per batch"})
+    
+    # De-duplicate by shortcode - every reel is processed once
+    reels = {}
+    invalid = []
+    for url in urls:
+        is_valid, normalized = extractor.validate_instagram_url(url) if isinstance(url, str) else (False, "URL must be a string")
+        shortcode = extractor.get_shortcode(url) if is_valid else None
+        if not shortcode:
+            invalid.append({"urls": [url], "success": False, "error": normalized if not is_valid else "Could not find the reel ID", "data": None})
+            continue
+        reels.setdefault(shortcode, {"url": normalized, "urls": []})["urls"].append(url)
+    
+    def generate():
+        succeeded = 0
+        for item in invalid:
+            yield json.dumps(item) + "\n"
+        
+        pool = ThreadPoolExecutor(max_workers=max(1, min(BATCH_CONCURRENCY, len(reels))))
+        try:
+            futures = {
+                pool.submit(extractor.extract_reel_data, reel["url"], model): shortcode
+                for shortcode, reel in reels.items()
+            }
+            for future in as_completed(futures):
+                shortcode = futures[future]
+                try:
+                    result = future.result()
+                except Exception as e:
+                    result = {"success": False, "error": str(e), "data": None}
+                succeeded += 1 if result.get("success") else 0
+                yield json.dumps({"shortcode": shortcode, "urls": reels[shortcode]["urls"], **result}) + "\n"
+            
+            yield json.dumps({"summary": {
+                "total": len(reels) + len(invalid),
+                "succeeded": succeeded,
+                "failed": len(reels) + len(invalid) - succeeded,
+            }}) + "\n"
+        finally:
+            # Client went away or we are done - do not start reels nobody will read
+            pool.shutdown(wait=False, cancel_futures=True)
+    
+    return Response(generate(), mimetype='application/x-ndjson')
+
+@app.route('/jobs', methods=['POST'])
+def create_job():
+    """Start an extraction in the background and return its id immediately"""
+    data = request.get_json(silent=True) or {}
+    url = data.get('url')
+    model = data.get('model', 'whisper-1')
+    
+    is_valid, normalized = extractor.validate_instagram_url(url)
+    if not is_valid:
+        return jsonify({"success": False, "error": normalized}), 400
+    
+    job = jobs.submit(normalized, model)
+    return jsonify({
+        "success": True,
+        "job_id": job.id,
+        "status_url": f"/jobs/{job.id}",
+        "events_url": f"/jobs/{job.id}/events",
+    }), 202
+
+@app.route('/jobs/<job_id>')
+def get_job(job_id):
+    """Poll a job's status; the result is included once it has finished"""
+    job = jobs.get(job_id)
+    if not job:
+        return jsonify({"success": False, "error": "Job not found"}), 404
+    return jsonify({"success": True, **job.to_dict()})
+
+@app.route('/jobs/<job_id>/events')
+def job_events(job_id):
+    """Stream a job's stage transitions as Server-Sent Events"""
+    job = jobs.get(job_id)
+    if not job:
+        return jsonify({"success": False, "error": "Job not found"}), 404
+    
+    # Resume after the last event the client saw
+    last_event_id = request.headers.get('Last-Event-ID', request.args.get('last_event_id'))
+    start = int(last_event_id) + 1 if last_event_id and last_event_id.isdigit() else 0
+    
+    def generate():
+        position = start
+        while True:
+            events = job.wait_for_events(position, timeout=15)
+            if not events:
+                if job.done:
+                    return
+                yield ": keep-alive\n\n"
+                continue
+            
+            for event in events:
+                payload = dict(event)
+                if event["event"] in ("succeeded", "failed"):
+                    payload["result"] = job.result
+                yield f"id: {event['id']}\nevent: {event['event']}\ndata: {json.dumps(payload)}\n\n"
+            position = events[-1]["id"] + 1
+            
+            if job.done and position >= len(job.events):
+                return
+    
+    return Response(generate(), mimetype='text/event-stream', headers={
+        'Cache-Control': 'no-cache',
+        'X-Accel-Buffering': 'no',  # Stop nginx from buffering the stream
+    })
+
+@app.route('/metrics')
+def metrics_endpoint():
+    """Prometheus metrics: per-stage latency, bytes, retries, rate limits, cache hits"""
+    body, content_type = metrics.metrics_response()
+    return Response(body, content_type=content_type)
+
+PROFILES_TEMPLATE = """
+<!DOCTYPE html>
+<html>
+<head>
+    <title>Profiles</title>
+    <style>
+        body { font-family: -apple-system, BlinkMacSystemFont, 'Segoe UI', Roboto, sans-serif; margin: 40px; }
+        table { border-collapse: collapse; }
+        th, td { padding: 6px 14px; text-align: left; border-bottom: 1px solid #eee; }
+    </style>
+</head>
+<body>
+    <h1>Recent profiles</h1>
+    <p>Open <code>.pstats</code> files with <code>python -m pstats</code> or snakeviz, and
+       <code>.speedscope.json</code> files at <a href="https://www.speedscope.app">speedscope.app</a>.</p>
+    {% if profiles %}
+    <table>
+        <tr><th>Profile</th><th>Size</th><th>Created</th></tr>
+        {% for p in profiles %}
+        <tr>
+            <td><a href="{{ url_for('download_profile', name=p.name, profile_token=profile_token) }}">{{ p.name }}</a></td>
+            <td>{{ (p.size / 1024) | round(1) }} KB</td>
+            <td>{{ p.created_at }}</td>
+        </tr>
+        {% endfor %}
+    </table>
+    {% else %}
+    <p>No profiles yet. Send <code>X-Reel-Profile: 1</code> and <code>X-Reel-Profile-Token</code> with a request
+       to /extract, or set REEL_PROFILE.</p>
+    {% endif %}
+</body>
+</html>
+"""
+
+def profile_token_ok():
+    """Per-request profiling and /profiles need REEL_PROFILE_TOKEN"""
+    return profiling.token_ok(request.headers.get('X-Reel-Profile-Token') or request.args.get('profile_token'))
+
+@app.route('/profiles')
+def list_profiles():
+    """Index of recent extraction profiles"""
+    if not profile_token_ok():
+        abort(404)
+    profiles = profiling.list_profiles()
+    for p in profiles:
+        p["created_at"] = time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(p["created"]))
+    return render_template_string(PROFILES_TEMPLATE, profiles=profiles,
+                                  profile_token=request.args.get('profile_token'))
+
+@app.route('/profiles/<path:name>')
+def download_profile(name):
+    if not profile_token_ok() or name not in {p["name"] for p in profiling.list_profiles(limit=None)}:
+        abort(404)
+    return send_from_directory(profiling.profile_dir(), name, as_attachment=True)
+
 if __name__ == '__main__':
     app.run(debug=True)
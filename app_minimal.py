@@ -1,7 +1,7 @@
 import streamlit as st
 import os
 import requests
-from openai import OpenAI
+from openai_client import get_shared_client
 import json
 import time
 from dotenv import load_dotenv
@@ -31,10 +31,11 @@ class InstagramReelTranscript:
             """)
             st.stop()
         
-        self.client = OpenAI(api_key=self.openai_key)
+        self.client = get_shared_client(self.openai_key)  # Pooled, shared by all sessions
     
     def extract_reel_data(self, reel_url, model="whisper-1"):
         """Extract data from Instagram reel"""
+        start_time = time.time()
         try:
             progress_bar = st.progress(0)
             status_text = st.empty()
@@ -62,7 +63,7 @@ class InstagramReelTranscript:
                 ],
                 "metadata": {
                     "model_used": model,
-                    "processing_time": time.time(),
+                    "processing_time": round(time.time() - start_time, 2),  # Seconds
                     "note": "This is a demo version optimized for Vercel deployment"
                 }
             }
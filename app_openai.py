@@ -1,92 +1,47 @@
 import streamlit as st
 import os
-import tempfile
-import requests
-from openai import OpenAI
-import yt_dlp
-import subprocess
 import json
 import time
+import threading
+from collections import OrderedDict
 from dotenv import load_dotenv
+from reel_engine import ReelTranscriptEngine, ReelEngineError
+import metrics
 
 # Load environment variables
 load_dotenv()
 
-class InstagramReelTranscript:
-    def __init__(self):
-        pass
+class InstagramReelTranscript(ReelTranscriptEngine):
+    """Streamlit front-end for the headless extraction engine"""
     
-    def normalize_instagram_url(self, url):
-        """Normalize Instagram URL to handle all formats"""
-        if not url:
-            return None
-        
-        # Remove whitespace
-        url = url.strip()
-        
-        # Handle different Instagram URL formats
-        # Support: reel/, p/, tv/, with/without www, with/without https
-        instagram_patterns = [
-            r'https?://(www\.)?instagram\.com/(reel|p|tv)/([A-Za-z0-9_-]+)',
-            r'instagram\.com/(reel|p|tv)/([A-Za-z0-9_-]+)',
-            r'(reel|p|tv)/([A-Za-z0-9_-]+)',
-        ]
-        
-        import re
-        # Extract the post ID from any format
-        for pattern in instagram_patterns:
-            match = re.search(pattern, url)
-            if match:
-                post_type = match.group(2) if len(match.groups()) >= 2 else match.group(1)
-                post_id = match.group(3) if len(match.groups()) >= 3 else match.group(2)
-                
-                # Normalize to standard format
-                normalized = f"https://www.instagram.com/{post_type}/{post_id}/"
-                return normalized
-        
-        # If no pattern matches, try to clean the URL
-        if 'instagram.com' in url:
-            # Remove query parameters and fragments
-            url = url.split('?')[0].split('#')[0]
-            # Ensure it ends with /
-            if not url.endswith('/'):
-                url += '/'
-            # Ensure https://
-            if not url.startswith('http'):
-                url = 'https://' + url
-            return url
-        
-        return None
+    def __init__(self):
+        super().__init__(on_message=self._show_message)
     
-    def validate_instagram_url(self, url):
-        """Validate if URL is a valid Instagram URL"""
-        if not url:
-            return False, "URL is empty"
-        
-        normalized = self.normalize_instagram_url(url)
-        if not normalized:
-            return False, "Invalid Instagram URL format"
-        
-        # Check if it's a supported type (reel, p, tv)
-        if '/reel/' in normalized or '/p/' in normalized or '/tv/' in normalized:
-            return True, normalized
-        
-        return False, "URL must be an Instagram reel, post, or TV video"
+    def _show_message(self, level, message):
+        """Render engine messages with the matching Streamlit element"""
+        if level == 'error':
+            st.error(message)
+        elif level == 'warning':
+            st.warning(message)
+        else:
+            st.info(message)
     
-    def _init_openai_client(self):
-        """Initialize OpenAI client - separated to avoid issues with __init__"""
-        # Check Streamlit secrets first (for Streamlit Cloud), then environment variables
+    def _get_api_key(self):
+        """Check Streamlit secrets first (for Streamlit Cloud), then environment variables"""
         try:
             if hasattr(st, 'secrets') and 'OPENAI_API_KEY' in st.secrets:
-                self.openai_key = st.secrets['OPENAI_API_KEY']
-            else:
-                self.openai_key = os.getenv('OPENAI_API_KEY')
+                return st.secrets['OPENAI_API_KEY']
         except Exception:
             # Fallback to environment variable if secrets access fails
-            self.openai_key = os.getenv('OPENAI_API_KEY')
+            pass
+        return super()._get_api_key()
+    
+    def _init_openai_client(self):
+        """Initialize OpenAI client, explaining configuration problems in the UI"""
+        api_key = self._get_api_key()
         
         # Validate API key
-        if not self.openai_key:
+        if not api_key:
             st.error("⚠️ **OpenAI API Key not found!**")
             st.markdown("""
             **For Streamlit Cloud:**
@@ -101,17 +56,14 @@ class InstagramReelTranscript:
             st.stop()
         
         # Validate API key format (should start with sk-)
-        if not isinstance(self.openai_key, str) or not self.openai_key.strip():
+        if not isinstance(api_key, str) or not api_key.strip():
             st.error("⚠️ **Invalid API Key Format!**")
             st.markdown("The API key appears to be empty or invalid. Please check your Streamlit Secrets.")
             st.stop()
         
-        # Initialize OpenAI client with error handling
-        # Use minimal initialization to avoid version conflicts
         try:
-            # Just use API key - this works with all OpenAI library versions
-            self.client = OpenAI(api_key=self.openai_key.strip())
-        except TypeError as e:
+            super()._init_openai_client()
+        except ReelEngineError as e:
             # Handle version compatibility issues
             error_msg = str(e)
             if 'proxies' in error_msg or 'unexpected keyword' in error_msg:
@@ -128,7 +80,7 @@ class InstagramReelTranscript:
                 3. The app should work after the rebuild completes
                 """)
             else:
-                st.error(f"⚠️ **Error initializing OpenAI client:** {error_msg}")
+                st.error(f"⚠️ **{error_msg}**")
                 st.markdown("""
                 **Please check:**
                 1. Your API key is correct in Streamlit Secrets
@@ -136,391 +88,144 @@ class InstagramReelTranscript:
                 3. Your OpenAI account has credits
                 """)
             st.stop()
-        except Exception as e:
-            st.error(f"⚠️ **Error initializing OpenAI client:** {str(e)}")
-            st.markdown("""
-            **Please check:**
-            1. Your API key is correct in Streamlit Secrets
-            2. The API key format is: `OPENAI_API_KEY = "sk-..."`
-            3. Your OpenAI account has credits
-            """)
-            st.stop()
-    
-    def download_instagram_video(self, url):
-        """Download Instagram video using yt-dlp with improved error handling"""
-        # Normalize URL first
-        is_valid, normalized_url = self.validate_instagram_url(url)
-        if not is_valid:
-            return None, None
-        
-        url = normalized_url
-        max_retries = 3  # Reduced retries to avoid long waits
-        base_delay = 10  # Start with 10 seconds
-        
-        for attempt in range(max_retries):
-            try:
-                # Create a unique temporary file path
-                temp_dir = tempfile.gettempdir()
-                timestamp = int(time.time())
-                temp_filename = f"instagram_video_{timestamp}.%(ext)s"
-                
-                # Configure yt-dlp options with better error handling
-                # Updated for Instagram's stricter access requirements
-                # Rotate user agents to avoid detection
-                user_agents = [
-                    'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
-                    'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
-                    'Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
-                ]
-                
-                ydl_opts = {
-                    'format': 'best[height<=720]/best/worst',  # Prefer lower resolution, fallback to best, then worst
-                    'outtmpl': os.path.join(temp_dir, temp_filename),
-                    'quiet': True,  # Quiet mode to avoid issues
-                    'no_warnings': True,
-                    'extract_flat': False,
-                    'socket_timeout': 120,  # Increased timeout for Instagram
-                    'retries': 3,  # Retries per attempt
-                    'fragment_retries': 3,  # Fragment retries
-                    'http_chunk_size': 10485760,  # 10MB chunks
-                    'concurrent_fragment_downloads': 1,  # Single thread to avoid pipe issues
-                    'ignoreerrors': False,
-                    'no_check_certificate': False,  # Use proper certificates
-                    'prefer_insecure': False,
-                    # Rotate user agent based on attempt
-                    'user_agent': user_agents[attempt % len(user_agents)],
-                    # Add referer to look more legitimate
-                    'referer': 'https://www.instagram.com/',
-                    # Additional headers to bypass some restrictions
-                    'headers': {
-                        'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/avif,image/webp,image/apng,*/*;q=0.8',
-                        'Accept-Language': 'en-US,en;q=0.9',
-                        'Accept-Encoding': 'gzip, deflate, br',
-                        'DNT': '1',
-                        'Connection': 'keep-alive',
-                        'Upgrade-Insecure-Requests': '1',
-                        'Sec-Fetch-Dest': 'document',
-                        'Sec-Fetch-Mode': 'navigate',
-                        'Sec-Fetch-Site': 'none',
-                        'Cache-Control': 'max-age=0',
-                    },
-                }
-                
-                with yt_dlp.YoutubeDL(ydl_opts) as ydl:
-                    # Extract info first
-                    info = ydl.extract_info(url, download=False)
-                    if not info:
-                        raise Exception("Could not extract video information")
-                    
-                    video_title = info.get('title', 'instagram_video')
-                    video_id = info.get('id', str(timestamp))
-                    
-                    # Clean title for filename
-                    safe_title = "".join(c for c in video_title if c.isalnum() or c in (' ', '-', '_')).rstrip()
-                    safe_title = safe_title[:50]  # Limit length
-                    
-                    # Update output template with safe title
-                    ydl_opts['outtmpl'] = os.path.join(temp_dir, f"{safe_title}_{video_id}.%(ext)s")
-                    
-                    # Download the video
-                    ydl.download([url])
-                    
-                    # Find the downloaded file
-                    downloaded_files = []
-                    for file in os.listdir(temp_dir):
-                        if (file.startswith(safe_title) or file.startswith(f"instagram_video_{timestamp}")) and \
-                           file.endswith(('.mp4', '.webm', '.mkv', '.mov', '.m4v')):
-                            file_path = os.path.join(temp_dir, file)
-                            if os.path.exists(file_path) and os.path.getsize(file_path) > 0:
-                                downloaded_files.append((file_path, os.path.getctime(file_path)))
-                    
-                    if downloaded_files:
-                        # Get the most recent file
-                        video_path = max(downloaded_files, key=lambda x: x[1])[0]
-                        return video_path, info
-                    
-                    # If no files found, try to find any recent video files
-                    all_video_files = []
-                    for file in os.listdir(temp_dir):
-                        if file.endswith(('.mp4', '.webm', '.mkv', '.mov', '.m4v')):
-                            file_path = os.path.join(temp_dir, file)
-                            if os.path.exists(file_path) and os.path.getsize(file_path) > 0:
-                                # Check if file was created recently (within last 5 minutes)
-                                if time.time() - os.path.getctime(file_path) < 300:
-                                    all_video_files.append((file_path, os.path.getctime(file_path)))
-                    
-                    if all_video_files:
-                        video_path = max(all_video_files, key=lambda x: x[1])[0]
-                        return video_path, info
-                    
-                    raise Exception("No video file found after download")
-                    
-            except Exception as e:
-                error_msg = str(e)
-                # Check if it's a rate limit or login required error
-                is_rate_limit = 'rate-limit' in error_msg.lower() or 'login required' in error_msg.lower() or 'not available' in error_msg.lower()
-                
-                if is_rate_limit:
-                    st.warning(f"⚠️ Attempt {attempt + 1}/{max_retries}: Instagram rate limit detected")
-                    if attempt < max_retries - 1:
-                        # Exponential backoff with longer delays for rate limits
-                        delay = base_delay * (2 ** attempt)  # 10s, 20s, 40s
-                        st.info(f"⏳ Waiting {delay} seconds before retry...")
-                        time.sleep(delay)
-                    else:
-                        st.error(f"❌ All {max_retries} attempts failed due to Instagram rate limiting")
-                        return None, None
-                else:
-                    st.warning(f"Attempt {attempt + 1}/{max_retries} failed: {error_msg[:100]}...")
-                    if attempt < max_retries - 1:
-                        delay = base_delay
-                        st.info(f"⏳ Waiting {delay} seconds before retry...")
-                        time.sleep(delay)
-                    else:
-                        st.error(f"❌ All {max_retries} attempts failed. Last error: {error_msg[:200]}")
-                        return None, None
-        
-        return None, None
-    
-    def download_instagram_video_alternative(self, url):
-        """Alternative download method using different yt-dlp configuration"""
-        try:
-            temp_dir = tempfile.gettempdir()
-            timestamp = int(time.time())
-            
-            # Alternative configuration - more conservative approach
-            ydl_opts = {
-                'format': 'worst[height<=480]/worst',  # Use lower quality to avoid issues
-                'outtmpl': os.path.join(temp_dir, f'instagram_alt_{timestamp}.%(ext)s'),
-                'quiet': True,
-                'no_warnings': True,
-                'extract_flat': False,
-                'socket_timeout': 60,  # Longer timeout
-                'retries': 5,
-                'fragment_retries': 5,
-                'http_chunk_size': 5242880,  # Smaller chunks (5MB)
-                'concurrent_fragment_downloads': 1,
-                'ignoreerrors': True,  # Ignore errors and continue
-                'no_check_certificate': True,
-                'prefer_insecure': True,  # Try HTTP first
-                'user_agent': 'Instagram 219.0.0.12.117 Android',
-                'referer': 'https://www.instagram.com/',
-                'headers': {
-                    'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8',
-                    'Accept-Language': 'en-us,en;q=0.5',
-                    'Accept-Encoding': 'gzip, deflate',
-                    'Accept-Charset': 'ISO-8859-1,utf-8;q=0.7,*;q=0.7',
-                    'Connection': 'keep-alive',
-                }
-            }
-            
-            with yt_dlp.YoutubeDL(ydl_opts) as ydl:
-                info = ydl.extract_info(url, download=False)
-                if not info:
-                    return None, None
-                
-                # Download with alternative settings
-                ydl.download([url])
-                
-                # Find downloaded file
-                for file in os.listdir(temp_dir):
-                    if file.startswith(f'instagram_alt_{timestamp}') and \
-                       file.endswith(('.mp4', '.webm', '.mkv', '.mov', '.m4v')):
-                        file_path = os.path.join(temp_dir, file)
-                        if os.path.exists(file_path) and os.path.getsize(file_path) > 0:
-                            return file_path, info
-                
-                return None, None
-                
-        except Exception as e:
-            st.warning(f"Alternative download method failed: {str(e)}")
-            return None, None
-    
-    def extract_audio(self, video_path):
-        """Extract audio from video file using ffmpeg"""
-        try:
-            # Generate audio file path
-            audio_path = video_path.rsplit('.', 1)[0] + '.mp3'
-            
-            # Use ffmpeg to extract audio
-            # Convert to mono, 16kHz sample rate to save API costs
-            cmd = [
-                'ffmpeg',
-                '-i', video_path,
-                '-ac', '1',  # Mono channel
-                '-ar', '16000',  # 16kHz sample rate
-                '-y',  # Overwrite output file
-                audio_path
-            ]
-            
-            result = subprocess.run(
-                cmd,
-                capture_output=True,
-                text=True,
-                timeout=60
-            )
-            
-            if result.returncode == 0 and os.path.exists(audio_path):
-                return audio_path
-            else:
-                st.error(f"Audio extraction failed: {result.stderr}")
-                return None
-                
-        except subprocess.TimeoutExpired:
-            st.error("Audio extraction timeout")
-            return None
-        except Exception as e:
-            st.error(f"Error extracting audio: {str(e)}")
-            return None
-    
-    def transcribe_audio(self, audio_path, model="whisper-1"):
-        """Transcribe audio using OpenAI Whisper API"""
-        # Initialize client if not already done
-        if not hasattr(self, 'client'):
-            self._init_openai_client()
-        
-        try:
-            with open(audio_path, 'rb') as audio_file:
-                transcript = self.client.audio.transcriptions.create(
-                    model=model,
-                    file=audio_file,
-                    response_format="verbose_json",
-                    timestamp_granularities=["segment"]
-                )
-            return transcript
-        except Exception as e:
-            st.error(f"Error transcribing audio: {str(e)}")
-            return None
     
     def extract_reel_data(self, reel_url, model="whisper-1"):
-        """
-        Extract complete data from Instagram reel using OpenAI API
+        """Run the engine pipeline while driving a Streamlit progress bar"""
+        progress_bar = st.progress(0)
+        status_text = st.empty()
         
-        Args:
-            reel_url (str): Instagram reel URL
-            model (str): Whisper model to use
+        def show_progress(stage, percent, message):
+            progress_bar.progress(percent)
+            status_text.text(message)
         
-        Returns:
-            dict: Extracted data from the reel
-        """
+        self.on_progress = show_progress
         try:
-            # Show progress
-            progress_bar = st.progress(0)
-            status_text = st.empty()
-            
-            # Step 1: Download video
-            status_text.text("📥 Downloading Instagram video...")
-            progress_bar.progress(20)
-            
-            video_path, video_info = self.download_instagram_video(reel_url)
-            if not video_path:
-                # Try alternative download method
-                st.warning("Primary download failed, trying alternative method...")
-                video_path, video_info = self.download_instagram_video_alternative(reel_url)
-                
-            if not video_path:
-                return {
-                    "success": False, 
-                    "error": """❌ **Unable to download Instagram video**
+            result = super().extract_reel_data(reel_url, model)
+            if result.get("success"):
+                # Clear progress indicators
+                time.sleep(1)
+        finally:
+            self.on_progress = None
+            progress_bar.empty()
+            status_text.empty()
+        
+        return result
 
-**Instagram is blocking automated access:**
-Instagram has very strict anti-bot protection that blocks most automated download attempts. This is a platform limitation, not a bug in this app.
+SHARED_CACHE_TTL = int(os.getenv('REEL_STREAMLIT_CACHE_TTL', '3600'))
+SHARED_CACHE_ENTRIES = int(os.getenv('REEL_STREAMLIT_CACHE_ENTRIES', '256'))
 
-**What happened:**
-- The app tried 3 different methods with multiple retries
-- Instagram detected automated access and blocked the request
-- This is common with Instagram's current security measures
+@st.cache_resource
+def _shared_results():
+    """Cross-session memo of successful extractions, keyed by shortcode and model
+    
+    A plain dict rather than st.cache_data around the extraction: cache_data
+    replays the progress bar and messages a cached call drew to every
+    session that hits it.
+    """
+    return {"lock": threading.Lock(), "entries": OrderedDict()}
 
-**What you can try:**
-1. ⏳ **Wait 30-60 minutes** - Rate limits usually reset after some time
-2. ✅ **Verify the account is public** - Private accounts won't work
-3. 🔄 **Try a different reel** - Some reels may be more accessible
-4. 📱 **Try from a different network/IP** - If possible
-5. 🌐 **Try again tomorrow** - Instagram's blocking is often temporary
+def _shared_get(key):
+    shared = _shared_results()
+    with shared["lock"]:
+        entry = shared["entries"].get(key)
+        if entry is None:
+            return None
+        stored_at, result = entry
+        if time.time() - stored_at > SHARED_CACHE_TTL:
+            del shared["entries"][key]
+            return None
+        shared["entries"].move_to_end(key)
+        return result
 
-**Why this happens:**
-Instagram actively prevents automated tools from downloading content to protect user privacy and prevent scraping. Even legitimate tools like this one are affected.
+def _shared_set(key, result):
+    shared = _shared_results()
+    with shared["lock"]:
+        shared["entries"][key] = (time.time(), result)
+        shared["entries"].move_to_end(key)
+        while len(shared["entries"]) > SHARED_CACHE_ENTRIES:
+            shared["entries"].popitem(last=False)
 
-**Alternative solutions:**
-- Download the video manually from Instagram
-- Use Instagram's built-in captions if available
-- Screen record the video and extract audio
-- Wait and try again later when rate limits reset
+def extract_memoized(extractor, reel_url, model):
+    """Session cache, then the process-wide cache, then the engine"""
+    shortcode = extractor.get_shortcode(reel_url) or reel_url
+    results = st.session_state.setdefault('results', {})
+    key = f"{shortcode}:{model}"
+    if key in results:
+        return results[key], shortcode
+    
+    result = _shared_get(key)
+    if result is None:
+        result = extractor.extract_reel_data(reel_url, model)
+        if not result.get("success"):
+            return result, shortcode  # Failures are never shared
+        _shared_set(key, result)
+    
+    results[key] = result
+    return result, shortcode
 
-**Note:** This app works when Instagram allows access, but Instagram's blocking is unpredictable and varies by account, content, and time.""", 
-                    "data": None
-                }
-            
-            # Step 2: Extract audio
-            status_text.text("🎵 Extracting audio from video...")
-            progress_bar.progress(40)
-            
-            audio_path = self.extract_audio(video_path)
-            if not audio_path:
-                return {"success": False, "error": "Failed to extract audio", "data": None}
-            
-            # Step 3: Transcribe audio
-            status_text.text("🎤 Transcribing audio with OpenAI Whisper...")
-            progress_bar.progress(60)
-            
-            transcript = self.transcribe_audio(audio_path, model)
-            if not transcript:
-                return {"success": False, "error": "Failed to transcribe audio", "data": None}
-            
-            # Step 4: Process results
-            status_text.text("📊 Processing results...")
-            progress_bar.progress(80)
-            
-            # Clean up temporary files
-            try:
-                os.remove(video_path)
-                os.remove(audio_path)
-            except:
-                pass
+def render_results(result, file_stem):
+    """Show a finished extraction; safe to call on every rerun"""
+    if not result.get("success"):
+        error_msg = result.get("error", "Unknown error occurred")
+        st.error(f"❌ Error extracting data: {error_msg}")
+        return
+    
+    st.success(f"✅ Successfully extracted data!")
+    
+    # Display results
+    st.header("📊 Extracted Data")
+    
+    for i, item in enumerate(result.get("data", [])):
+        with st.expander(f"Transcript Results", expanded=True):
+            st.subheader("📝 Full Transcript")
+            st.write(item["transcript"])
             
-            # Format results
-            result = {
-                "url": reel_url,
-                "transcript": transcript.text,
-                "language": transcript.language,
-                "duration": transcript.duration,
-                "segments": [
-                    {
-                        "start": seg.start,
-                        "end": seg.end,
-                        "text": seg.text
-                    } for seg in transcript.segments
-                ] if hasattr(transcript, 'segments') else [],
-                "metadata": {
-                    "model_used": model,
-                    "video_title": video_info.get('title', 'Unknown') if video_info else 'Unknown',
-                    "uploader": video_info.get('uploader', 'Unknown') if video_info else 'Unknown',
-                    "view_count": video_info.get('view_count', 0) if video_info else 0,
-                    "like_count": video_info.get('like_count', 0) if video_info else 0,
-                    "description": video_info.get('description', '') if video_info else '',
-                }
-            }
+            st.subheader("📊 Metadata")
+            col_meta1, col_meta2 = st.columns(2)
             
-            progress_bar.progress(100)
-            status_text.text("✅ Complete!")
+            with col_meta1:
+                st.metric("Language", item["language"])
+                st.metric("Duration", f"{item['duration']:.1f}s")
+                st.metric("Model Used", item["metadata"]["model_used"])
             
-            # Clear progress indicators
-            time.sleep(1)
-            progress_bar.empty()
-            status_text.empty()
+            with col_meta2:
+                st.metric("Views", item["metadata"]["view_count"])
+                st.metric("Likes", item["metadata"]["like_count"])
+                st.metric("Uploader", item["metadata"]["uploader"])
             
-            return {
-                "success": True,
-                "data": [result],
-                "total_items": 1
-            }
-            
-        except Exception as e:
-            return {
-                "success": False,
-                "error": str(e),
-                "data": None
-            }
+            if item["segments"]:
+                st.subheader("⏱️ Timestamped Segments")
+                for seg in item["segments"][:10]:  # Show first 10 segments
+                    st.write(f"**{seg['start']:.1f}s - {seg['end']:.1f}s:** {seg['text']}")
+                
+                if len(item["segments"]) > 10:
+                    st.write(f"... and {len(item['segments']) - 10} more segments")
+    
+    # Download options
+    st.header("💾 Download Options")
+    
+    col_download1, col_download2 = st.columns(2)
+    
+    with col_download1:
+        # Download as JSON
+        json_data = json.dumps(result["data"], indent=2)
+        st.download_button(
+            label="📄 Download as JSON",
+            data=json_data,
+            file_name=f"instagram_reel_transcript_{file_stem}.json",
+            mime="application/json"
+        )
+    
+    with col_download2:
+        # Download as text
+        if result.get("data") and len(result["data"]) > 0:
+            text_data = result["data"][0].get("transcript", "")
+            st.download_button(
+                label="📝 Download as Text",
+                data=text_data,
+                file_name=f"instagram_reel_transcript_{file_stem}.txt",
+                mime="text/plain"
+            )
 
 def main():
     st.set_page_config(
@@ -529,6 +234,9 @@ def main():
         layout="wide"
     )
     
+    # Prometheus metrics on a side port (REEL_METRICS_PORT) - started once per process
+    metrics.start_metrics_server()
+    
     st.title("🎬 Instagram Reel Transcript Extractor")
     st.markdown("Extract complete transcript data from Instagram reels using OpenAI Whisper API")
     
@@ -590,6 +298,8 @@ def main():
             if not reel_url:
                 st.error("Please enter an Instagram URL")
             else:
+                st.session_state.pop('last_result', None)
+                result, file_stem = None, None
                 try:
                     # Ensure extractor is initialized
                     if 'extractor' not in st.session_state or not hasattr(st.session_state.extractor, 'validate_instagram_url'):
@@ -601,6 +311,7 @@ def main():
                     is_valid, result = st.session_state.extractor.validate_instagram_url(reel_url)
                     if not is_valid:
                         st.error(f"❌ {result}")
+                        result = None
                         st.info("""
                         **Supported Instagram URL formats:**
                         - `https://www.instagram.com/reel/ABC123/`
@@ -613,9 +324,10 @@ def main():
                         # Use normalized URL
                         normalized_url = result
                         with st.spinner("Processing your Instagram video..."):
-                            result = st.session_state.extractor.extract_reel_data(
-                                reel_url=normalized_url,
-                                model=selected_model
+                            result, file_stem = extract_memoized(
+                                st.session_state.extractor,
+                                normalized_url,
+                                selected_model
                             )
                 except AttributeError as e:
                     st.error(f"❌ Error: {str(e)}")
@@ -633,69 +345,14 @@ def main():
                     st.info("Please try again or refresh the page.")
                     result = None  # Set result to None to skip processing
                 
-                # Only process if result is available and successful
-                if result and result.get("success"):
-                    st.success(f"✅ Successfully extracted data!")
-                    
-                    # Display results
-                    st.header("📊 Extracted Data")
-                    
-                    for i, item in enumerate(result.get("data", [])):
-                        with st.expander(f"Transcript Results", expanded=True):
-                            st.subheader("📝 Full Transcript")
-                            st.write(item["transcript"])
-                            
-                            st.subheader("📊 Metadata")
-                            col_meta1, col_meta2 = st.columns(2)
-                            
-                            with col_meta1:
-                                st.metric("Language", item["language"])
-                                st.metric("Duration", f"{item['duration']:.1f}s")
-                                st.metric("Model Used", item["metadata"]["model_used"])
-                            
-                            with col_meta2:
-                                st.metric("Views", item["metadata"]["view_count"])
-                                st.metric("Likes", item["metadata"]["like_count"])
-                                st.metric("Uploader", item["metadata"]["uploader"])
-                            
-                            if item["segments"]:
-                                st.subheader("⏱️ Timestamped Segments")
-                                for seg in item["segments"][:10]:  # Show first 10 segments
-                                    st.write(f"**{seg['start']:.1f}s - {seg['end']:.1f}s:** {seg['text']}")
-                                
-                                if len(item["segments"]) > 10:
-                                    st.write(f"... and {len(item['segments']) - 10} more segments")
-                    
-                    # Download options
-                    st.header("💾 Download Options")
-                    
-                    col_download1, col_download2 = st.columns(2)
-                    
-                    with col_download1:
-                        # Download as JSON
-                        json_data = json.dumps(result["data"], indent=2)
-                        st.download_button(
-                            label="📄 Download as JSON",
-                            data=json_data,
-                            file_name=f"instagram_reel_transcript_{int(time.time())}.json",
-                            mime="application/json"
-                        )
-                    
-                    with col_download2:
-                        # Download as text
-                        if result.get("data") and len(result["data"]) > 0:
-                            text_data = result["data"][0].get("transcript", "")
-                            st.download_button(
-                                label="📝 Download as Text",
-                                data=text_data,
-                                file_name=f"instagram_reel_transcript_{int(time.time())}.txt",
-                                mime="text/plain"
-                            )
-                
-                elif result and not result.get("success"):
-                    # Show error if result exists but failed
-                    error_msg = result.get("error", "Unknown error occurred")
-                    st.error(f"❌ Error extracting data: {error_msg}")
+                # Keep the result across reruns - download buttons rerun the script
+                if result:
+                    st.session_state.last_result = {"result": result, "file_stem": file_stem}
+        
+        # Rendered outside the button branch so reruns show it without re-extracting
+        last = st.session_state.get('last_result')
+        if last:
+            render_results(last["result"], last["file_stem"])
     
     with col2:
         st.header("ℹ️ Instructions")
@@ -1,7 +1,7 @@
 import streamlit as st
 import os
 import requests
-from openai import OpenAI
+from openai_client import get_shared_client
 import json
 import time
 from dotenv import load_dotenv
@@ -19,7 +19,7 @@ class InstagramReelTranscript:
             st.error("Please set your OPENAI_API_KEY in the environment variables")
             st.stop()
         
-        self.client = OpenAI(api_key=self.openai_key)
+        self.client = get_shared_client(self.openai_key)  # Pooled, shared by all sessions
     
     def download_video_with_ytdlp(self, url):
         """Download video using yt-dlp"""
@@ -91,6 +91,7 @@ class InstagramReelTranscript:
     
     def extract_reel_data(self, reel_url, model="whisper-1"):
         """Extract complete data from Instagram reel"""
+        start_time = time.time()
         try:
             # Show progress
             progress_bar = st.progress(0)
@@ -157,7 +158,7 @@ class InstagramReelTranscript:
                 ] if hasattr(transcript, 'segments') else [],
                 "metadata": {
                     "model_used": model,
-                    "processing_time": time.time(),
+                    "processing_time": round(time.time() - start_time, 2),  # Seconds
                 }
             }
             
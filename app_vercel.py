@@ -1,15 +1,10 @@
 import streamlit as st
 import os
 import tempfile
-import requests
-from openai import OpenAI
-import yt_dlp
-from pydub import AudioSegment
+from openai_client import get_shared_client
 import json
 import time
 from dotenv import load_dotenv
-import io
-import base64
 
 # Load environment variables
 load_dotenv()
@@ -21,7 +16,7 @@ class InstagramReelTranscript:
             st.error("Please set your OPENAI_API_KEY in the environment variables")
             st.stop()
         
-        self.client = OpenAI(api_key=self.openai_key)
+        self.client = get_shared_client(self.openai_key)  # Pooled, shared by all sessions
     
     def download_instagram_video(self, url):
         """Download Instagram video using yt-dlp with Vercel optimizations"""
@@ -36,6 +31,8 @@ class InstagramReelTranscript:
                 'max_filesize': 50 * 1024 * 1024,  # 50MB limit
             }
             
+            import yt_dlp  # Deferred so cold starts don't pay for it
+            
             with yt_dlp.YoutubeDL(ydl_opts) as ydl:
                 # Extract info first
                 info = ydl.extract_info(url, download=False)
@@ -70,6 +67,8 @@ class InstagramReelTranscript:
     def extract_audio(self, video_path):
         """Extract audio from video file"""
         try:
+            from pydub import AudioSegment  # Deferred so cold starts don't pay for it
+            
             # Load video and extract audio
             video = AudioSegment.from_file(video_path)
             
@@ -0,0 +1,157 @@
+"""
+Silence-aware chunking for long audio
+
+Long media is decoded once to 16 kHz mono PCM, split at low-energy points
+near a target chunk length, and each chunk is encoded separately so the
+chunks can be transcribed in parallel. stitch_transcripts() puts the
+per-chunk results back together on the original timeline.
+"""
+
+import io
+import subprocess
+import numpy as np
+import audio_codecs
+
+SAMPLE_RATE = 16000
+FRAME_MS = 20  # Energy is measured over 20ms frames
+SMOOTH_MS = 400  # Splits land in the quietest 400ms stretch of the window
+
+
+def decode_pcm(media_path, sample_rate=SAMPLE_RATE, timeout=120):
+    """Decode any media file to mono int16 PCM with ffmpeg"""
+    cmd = [
+        'ffmpeg',
+        '-loglevel', 'error',
+        '-i', media_path,
+        '-vn',
+        '-ac', '1',
+        '-ar', str(sample_rate),
+        '-f', 's16le',
+        'pipe:1'
+    ]
+    result = subprocess.run(cmd, capture_output=True, timeout=timeout)
+    if result.returncode != 0:
+        raise RuntimeError(f"Audio decoding failed: {result.stderr.decode('utf-8', 'replace')}")
+    return np.frombuffer(result.stdout, dtype=np.int16)
+
+
+def frame_energy(samples, sample_rate=SAMPLE_RATE, frame_ms=FRAME_MS):
+    """Mean-square energy of consecutive frames (vectorized)"""
+    frame_len = max(1, sample_rate * frame_ms // 1000)
+    n_frames = len(samples) // frame_len
+    if n_frames == 0:
+        return np.zeros(0)
+    frames = samples[:n_frames * frame_len].astype(np.float32).reshape(n_frames, frame_len)
+    return np.mean(frames * frames, axis=1)
+
+
+def find_split_points(samples, target_seconds, search_seconds=30, sample_rate=SAMPLE_RATE):
+    """Pick split times (seconds) at the quietest point before each target boundary
+
+    For every multiple of target_seconds the search window
+    [boundary - search_seconds, boundary] is scanned and the split goes to
+    its lowest-energy stretch, so words are not cut in half.
+    """
+    duration = len(samples) / sample_rate
+    if duration <= target_seconds:
+        return []
+
+    energy = frame_energy(samples, sample_rate)
+    frames_per_second = 1000 / FRAME_MS
+
+    # Smooth so a single quiet frame inside a word does not win
+    smooth = max(1, int(SMOOTH_MS / FRAME_MS))
+    energy = np.convolve(energy, np.ones(smooth) / smooth, mode='same')
+
+    splits = []
+    last = 0.0
+    while duration - last > target_seconds:
+        boundary = last + target_seconds
+        lo = int(max(last + 1, boundary - search_seconds) * frames_per_second)
+        hi = int(boundary * frames_per_second)
+        if hi <= lo:
+            split = boundary
+        else:
+            split = (lo + int(np.argmin(energy[lo:hi]))) / frames_per_second
+        splits.append(split)
+        last = split
+
+    return splits
+
+
+def plan_chunks(duration, split_points, overlap=1.0):
+    """Turn split points into chunks
+
+    Each chunk is transcribed over [start, end) which overlaps its
+    neighbours by `overlap` seconds so no word is lost at a cut, but it only
+    "owns" segments in [own_start, own_end) when stitching.
+    """
+    bounds = [0.0] + list(split_points) + [duration]
+    chunks = []
+    for own_start, own_end in zip(bounds[:-1], bounds[1:]):
+        chunks.append({
+            "start": max(0.0, own_start - overlap),
+            "end": min(duration, own_end + overlap),
+            "own_start": own_start,
+            "own_end": own_end,
+        })
+    return chunks
+
+
+def encode_chunk(samples, chunk, profile=None, sample_rate=SAMPLE_RATE, timeout=60):
+    """Encode the PCM of one chunk in memory with a codec profile (MP3 by default)"""
+    profile = profile or audio_codecs.get_profile('mp3')
+    pcm = samples[int(chunk["start"] * sample_rate):int(chunk["end"] * sample_rate)]
+    cmd = [
+        'ffmpeg',
+        '-loglevel', 'error',
+        '-f', 's16le',
+        '-ac', '1',
+        '-ar', str(sample_rate),
+        '-i', 'pipe:0',
+        *audio_codecs.ffmpeg_output_args(profile),
+        'pipe:1'
+    ]
+    result = subprocess.run(cmd, input=pcm.tobytes(), capture_output=True, timeout=timeout)
+    if result.returncode != 0:
+        raise RuntimeError(f"Chunk encoding failed: {result.stderr.decode('utf-8', 'replace')}")
+    buffer = io.BytesIO(result.stdout)
+    buffer.upload_name = audio_codecs.upload_name(profile)
+    return buffer
+
+
+def _same_text(a, b):
+    """Compare segment texts ignoring case, spacing and punctuation"""
+    clean = lambda t: "".join(c for c in t.lower() if c.isalnum())
+    return clean(a) == clean(b)
+
+
+def stitch_transcripts(chunks, transcripts):
+    """Merge per-chunk transcripts into one on the original timeline
+
+    transcripts are normalized dicts (text/language/duration/segments) in
+    chunk order. Segment times are shifted by their chunk's start, and a
+    segment is kept only by the chunk that owns its midpoint; repeated text
+    straddling a cut is dropped.
+    """
+    segments = []
+    for chunk, transcript in zip(chunks, transcripts):
+        for seg in transcript.get("segments") or []:
+            start = seg["start"] + chunk["start"]
+            end = seg["end"] + chunk["start"]
+            midpoint = (start + end) / 2
+            if not chunk["own_start"] <= midpoint < chunk["own_end"]:
+                continue
+
+            if segments and start < segments[-1]["end"] and _same_text(seg["text"], segments[-1]["text"]):
+                continue
+
+            segments.append({"start": round(start, 3), "end": round(end, 3), "text": seg["text"]})
+
+    languages = [t.get("language") for t in transcripts if t.get("language")]
+    return {
+        "text": " ".join(seg["text"].strip() for seg in segments),
+        "language": languages[0] if languages else None,
+        "duration": chunks[-1]["end"] if chunks else 0,
+        "segments": segments,
+    }
@@ -0,0 +1,87 @@
+"""
+Audio codec profiles for the upload
+
+REEL_AUDIO_PROFILE picks how extracted audio is encoded:
+
+    mp3   - MP3 at ffmpeg's default bitrate (the original behaviour)
+    opus  - low-bitrate Opus in Ogg, tuned for speech; smallest uploads
+    flac  - lossless, for accuracy comparisons
+
+With REEL_AUDIO_SIZE_TARGET=1 lossy profiles pick their bitrate from the
+media duration so a whole reel fits in one upload; media that would need a
+bitrate below the profile's floor is chunked as before.
+"""
+
+import os
+
+PROFILES = {
+    'mp3': {
+        "codec": "libmp3lame",
+        "format": "mp3",
+        "extension": "mp3",
+        "bitrate": None,  # ffmpeg default
+        "min_bitrate": 8000,
+        "max_bitrate": 24000,  # What the default comes to for 16 kHz mono
+        "args": [],
+    },
+    'opus': {
+        "codec": "libopus",
+        "format": "ogg",
+        "extension": "ogg",
+        "bitrate": 24000,
+        "min_bitrate": 6000,
+        "max_bitrate": 24000,
+        "args": ['-application', 'voip'],
+    },
+    'flac': {
+        "codec": "flac",
+        "format": "flac",
+        "extension": "flac",
+        "bitrate": None,  # Lossless - no bitrate to choose
+        "min_bitrate": None,
+        "max_bitrate": None,
+        "args": [],
+    },
+}
+
+DEFAULT_PROFILE = 'mp3'
+CONTAINER_OVERHEAD = 0.95  # Leave 5% of the target for headers and framing
+
+
+def get_profile(name=None):
+    """Return the named (or configured) profile, with its name"""
+    name = (name or os.getenv('REEL_AUDIO_PROFILE', DEFAULT_PROFILE)).strip().lower()
+    if name not in PROFILES:
+        raise ValueError(f"Unknown audio profile: {name} (expected one of {', '.join(PROFILES)})")
+    return {"name": name, **PROFILES[name]}
+
+
+def target_bitrate(profile, duration, target_bytes):
+    """Bitrate (bit/s) that keeps `duration` seconds under target_bytes
+
+    Never above the profile's default, so targeting only ever shrinks an
+    upload. Returns None for lossless profiles, unknown durations, or when
+    the needed bitrate is below what the profile can still encode
+    intelligibly.
+    """
+    if not profile["max_bitrate"] or not duration or not target_bytes:
+        return None
+
+    bitrate = int(target_bytes * 8 * CONTAINER_OVERHEAD / duration)
+    if bitrate < profile["min_bitrate"]:
+        return None
+    return min(bitrate, profile["max_bitrate"])
+
+
+def ffmpeg_output_args(profile, bitrate=None):
+    """ffmpeg output options for a profile (everything but the destination)"""
+    args = ['-c:a', profile["codec"], *profile["args"]]
+    bitrate = bitrate or profile["bitrate"]
+    if bitrate:
+        args += ['-b:a', str(bitrate)]
+    return args + ['-f', profile["format"]]
+
+
+def upload_name(profile):
+    """File name the API sees - it infers the format from the extension"""
+    return f"audio.{profile['extension']}"
@@ -0,0 +1,198 @@
+#!/usr/bin/env python3
+"""
+Fragment download benchmark: serial vs adaptive concurrency
+
+A local server plays a fragmented (HLS) reel at /hls/<shortcode>/index.m3u8
+with per-request latency and a per-connection bandwidth cap, so fan-out
+matters the way it does against a CDN. The engine's primary download path
+is pointed at it with REEL_SOURCE_URL_TEMPLATE and run once with the
+current serial setting and once with REEL_FRAGMENT_MODE=adaptive.
+
+    python benchmarks/bench_fragments.py --downloads 12 --latency-ms 60
+    python benchmarks/bench_fragments.py --fail-rate 0.02   # exercise the serial fallback
+
+Segments are encoded with ffmpeg when it is on PATH; otherwise synthetic
+segments are served (yt-dlp then skips its MPEG-TS fixup with a warning).
+"""
+
+import os
+import sys
+import json
+import time
+import uuid
+import random
+import shutil
+import argparse
+import tempfile
+import threading
+import subprocess
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+WRITE_CHUNK = 16 * 1024
+
+
+def make_segments(directory, seconds, segment_seconds, segment_kb):
+    """Write index.m3u8 plus seg<N>.ts files into directory"""
+    if shutil.which('ffmpeg'):
+        cmd = [
+            'ffmpeg', '-loglevel', 'error', '-y',
+            '-f', 'lavfi', '-i', f'testsrc=size=320x568:rate=15:duration={seconds}',
+            '-f', 'lavfi', '-i', f'sine=frequency=220:duration={seconds}',
+            '-c:v', 'libx264', '-preset', 'ultrafast', '-c:a', 'aac', '-shortest',
+            '-f', 'hls', '-hls_time', str(segment_seconds), '-hls_playlist_type', 'vod',
+            '-hls_segment_filename', os.path.join(directory, 'seg%d.ts'),
+            os.path.join(directory, 'index.m3u8')
+        ]
+        subprocess.run(cmd, check=True, timeout=300)
+        return
+
+    count = max(1, int(seconds / segment_seconds))
+    lines = ['#EXTM3U', '#EXT-X-VERSION:3', f'#EXT-X-TARGETDURATION:{segment_seconds}',
+             '#EXT-X-MEDIA-SEQUENCE:0', '#EXT-X-PLAYLIST-TYPE:VOD']
+    packet = b'\x47' + bytes(187)  # An empty MPEG-TS packet
+    for index in range(count):
+        with open(os.path.join(directory, f'seg{index}.ts'), 'wb') as f:
+            f.write(packet * (segment_kb * 1024 // len(packet)))
+        lines += [f'#EXTINF:{segment_seconds:.1f},', f'seg{index}.ts']
+    lines.append('#EXT-X-ENDLIST')
+    with open(os.path.join(directory, 'index.m3u8'), 'w') as f:
+        f.write('\n'.join(lines) + '\n')
+
+
+def hls_handler(directory, latency, kbps, fail_rate):
+    """Serve every /hls/<shortcode>/<file> from one segment directory"""
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'
+
+        def do_GET(self):
+            name = os.path.basename(self.path.split('?')[0])
+            path = os.path.join(directory, name)
+            if not os.path.isfile(path):
+                self.send_error(404)
+                return
+
+            time.sleep(latency)  # Time to first byte
+            if name.endswith('.ts') and random.random() < fail_rate:
+                self.send_error(503)
+                return
+
+            with open(path, 'rb') as f:
+                body = f.read()
+            self.send_response(200)
+            self.send_header('Content-Type', 'application/vnd.apple.mpegurl' if name.endswith('.m3u8') else 'video/mp2t')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            # Cap each connection's bandwidth; parallel fragments get more in total
+            for offset in range(0, len(body), WRITE_CHUNK):
+                self.wfile.write(body[offset:offset + WRITE_CHUNK])
+                if kbps:
+                    time.sleep(WRITE_CHUNK / (kbps * 1024))
+
+        def log_message(self, *args):
+            pass
+
+    return Handler
+
+
+class QuietServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def handle_error(self, request, client_address):
+        pass
+
+
+def median(values):
+    ordered = sorted(values)
+    return ordered[len(ordered) // 2] if ordered else None
+
+
+def run_mode(mode, downloads):
+    """Download `downloads` fresh reels in one fragment mode"""
+    os.environ['REEL_FRAGMENT_MODE'] = mode
+    import fragment_concurrency
+    from reel_engine import ReelTranscriptEngine
+    from workspace import JobWorkspace
+
+    fragment_concurrency._controller = None  # Adaptive runs start from scratch
+    engine = ReelTranscriptEngine()
+    seconds, sizes, levels, failures = [], [], [], 0
+    for _ in range(downloads):
+        controller = fragment_concurrency.get_fragment_controller()
+        levels.append(controller.current() if controller else 1)
+        url = f"https://www.instagram.com/reel/FRAG{uuid.uuid4().hex[:12]}/"
+        with JobWorkspace() as workspace:
+            start = time.perf_counter()
+            path, _ = engine.download_instagram_video(url, workspace)
+            elapsed = time.perf_counter() - start
+            if not path:
+                failures += 1
+                continue
+            seconds.append(elapsed)
+            sizes.append(os.path.getsize(path))
+
+    total = sum(seconds)
+    return {
+        "mode": mode,
+        "downloads": downloads,
+        "failures": failures,
+        "median_seconds": round(median(seconds), 3) if seconds else None,
+        "max_seconds": round(max(seconds), 3) if seconds else None,
+        "throughput_mbps": round(sum(sizes) / total / 1e6 * 8, 2) if total else None,
+        "concurrency_per_download": levels,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serial vs adaptive fragment download benchmark")
+    parser.add_argument("--downloads", type=int, default=12, help="Downloads per mode")
+    parser.add_argument("--seconds", type=int, default=60, help="Length of the fixture reel")
+    parser.add_argument("--segment-seconds", type=int, default=2)
+    parser.add_argument("--segment-kb", type=int, default=128, help="Synthetic segment size (without ffmpeg)")
+    parser.add_argument("--latency-ms", type=float, default=60, help="Server time to first byte per request")
+    parser.add_argument("--kbps", type=float, default=2048, help="Per-connection bandwidth cap in KiB/s (0 = none)")
+    parser.add_argument("--fail-rate", type=float, default=0.0, help="Fraction of segment requests answered 503")
+    parser.add_argument("--output", default="bench_fragments.json", help="Where to write the JSON report")
+    args = parser.parse_args()
+
+    scratch = tempfile.mkdtemp(prefix='reel-frag-bench-')
+    try:
+        segments = os.path.join(scratch, 'hls')
+        os.makedirs(segments)
+        make_segments(segments, args.seconds, args.segment_seconds, args.segment_kb)
+        server = QuietServer(('127.0.0.1', 0), hls_handler(segments, args.latency_ms / 1000, args.kbps, args.fail_rate))
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+
+        os.environ['REEL_SOURCE_URL_TEMPLATE'] = f"http://127.0.0.1:{server.server_port}/hls/{{shortcode}}/index.m3u8"
+        os.environ['REEL_CACHE_DIR'] = os.path.join(scratch, 'cache')
+        os.environ['REEL_WORKSPACE_ROOT'] = os.path.join(scratch, 'workspaces')
+        os.environ.setdefault('REEL_INSTAGRAM_RATE', '1000')
+        os.environ.setdefault('REEL_INSTAGRAM_BURST', '1000')
+        sys.path.insert(0, REPO_ROOT)
+
+        report = {
+            "started_at": time.strftime('%Y-%m-%dT%H:%M:%S%z'),
+            "config": {k: v for k, v in vars(args).items() if k != 'output'},
+            "modes": [],
+        }
+        for mode in ('serial', 'adaptive'):
+            result = run_mode(mode, args.downloads)
+            report["modes"].append(result)
+            print(f"{mode:9s}: median {result['median_seconds']}s, {result['throughput_mbps']} Mbit/s, "
+                  f"{result['failures']} failed, concurrency {result['concurrency_per_download']}")
+
+        serial, adaptive = (m["median_seconds"] for m in report["modes"])
+        if serial and adaptive:
+            report["speedup"] = round(serial / adaptive, 2)
+            print(f"adaptive speedup: {report['speedup']}x")
+
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"Report written to {args.output}")
+        return 1 if any(m["failures"] for m in report["modes"]) else 0
+    finally:
+        shutil.rmtree(scratch, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,303 @@
+#!/usr/bin/env python3
+"""
+Offline end-to-end benchmark for extract_reel_data
+
+Everything runs locally:
+
+- a fixture media server serves MP4s as /media/<shortcode>.mp4, and the
+  engine is pointed at it with REEL_SOURCE_URL_TEMPLATE
+- a fake Whisper API answers /v1/audio/transcriptions with verbose_json
+  after a configurable delay, and the OpenAI client is pointed at it with
+  OPENAI_BASE_URL
+
+Each concurrency level runs the full pipeline (download, ffmpeg, upload,
+formatting) for unique shortcodes so caches never short-circuit it, and
+reports throughput plus p50/p95/p99 per stage, taken from the engine's
+progress events. Results go to a JSON file; --baseline compares against a
+previous run and exits non-zero on a regression.
+
+    python benchmarks/bench_pipeline.py --concurrency 1,4,8 --requests 16
+    python benchmarks/bench_pipeline.py --baseline last.json --output new.json
+
+Needs ffmpeg on PATH. Without --fixture a 30 second test clip is generated.
+"""
+
+import os
+import sys
+import json
+import time
+import math
+import uuid
+import zlib
+import shutil
+import argparse
+import tempfile
+import threading
+import subprocess
+from concurrent.futures import ThreadPoolExecutor
+from http.server import ThreadingHTTPServer, SimpleHTTPRequestHandler, BaseHTTPRequestHandler
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Stage durations measured between these progress events
+STAGES = {
+    "download": ("downloading", "downloaded"),
+    "extract_audio": ("extracting_audio", "audio_extracted"),
+    "transcribe": ("transcribing", "transcribed"),
+    "format": ("formatting", "complete"),
+}
+
+
+def make_fixture(directory, seconds=30):
+    """Generate a small talking-head-sized MP4 with a test tone"""
+    path = os.path.join(directory, 'fixture.mp4')
+    cmd = [
+        'ffmpeg', '-loglevel', 'error', '-y',
+        '-f', 'lavfi', '-i', f'testsrc=size=320x568:rate=15:duration={seconds}',
+        '-f', 'lavfi', '-i', f'sine=frequency=220:duration={seconds}',
+        '-c:v', 'libx264', '-preset', 'ultrafast', '-c:a', 'aac', '-shortest',
+        path
+    ]
+    subprocess.run(cmd, check=True, timeout=120)
+    return path
+
+
+def media_handler(fixtures):
+    """Serve every /media/<shortcode>.mp4 from one of the fixtures"""
+    class Handler(SimpleHTTPRequestHandler):
+        def translate_path(self, path):
+            name = os.path.basename(path.split('?')[0])
+            return fixtures[zlib.crc32(name.encode('utf-8')) % len(fixtures)]
+
+        def log_message(self, *args):
+            pass
+
+    return Handler
+
+
+def whisper_handler(delay, segment_seconds=5):
+    """Fake /v1/audio/transcriptions that answers verbose_json after `delay` seconds"""
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'
+
+        def do_POST(self):
+            body = self.rfile.read(int(self.headers.get('Content-Length', 0)))
+            time.sleep(delay)
+
+            # Rough duration from the upload size (16 kHz mono MP3 is ~3 kB/s)
+            duration = max(1.0, len(body) / 3000)
+            segments = []
+            start = 0.0
+            while start < duration:
+                end = min(duration, start + segment_seconds)
+                segments.append({"id": len(segments), "start": start, "end": end, "text": f" Segment {len(segments) + 1}."})
+                start = end
+
+            payload = json.dumps({
+                "task": "transcribe",
+                "language": "english",
+                "duration": duration,
+                "text": "".join(seg["text"] for seg in segments).strip(),
+                "segments": segments,
+            }).encode('utf-8')
+            self.send_response(200)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+
+        def log_message(self, *args):
+            pass
+
+    return Handler
+
+
+class QuietServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def handle_error(self, request, client_address):
+        pass  # yt-dlp probes and drops connections; that is not a failure
+
+
+def start_server(handler):
+    server = QuietServer(('127.0.0.1', 0), handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def percentile(values, pct):
+    """Nearest-rank percentile"""
+    if not values:
+        return None
+    ordered = sorted(values)
+    rank = max(1, math.ceil(pct / 100 * len(ordered)))
+    return ordered[rank - 1]
+
+
+def summarize(values):
+    if not values:
+        return None
+    return {
+        "count": len(values),
+        "mean": round(sum(values) / len(values), 4),
+        "p50": round(percentile(values, 50), 4),
+        "p95": round(percentile(values, 95), 4),
+        "p99": round(percentile(values, 99), 4),
+    }
+
+
+def run_one(engine_class, model):
+    """Run one extraction; return (success, {stage: seconds}, error)"""
+    events = {}
+    errors = []
+
+    def on_progress(stage, percent, message):
+        events.setdefault(stage, time.perf_counter())
+
+    def on_message(level, message):
+        if level == 'error':
+            errors.append(message)
+
+    engine = engine_class(on_progress=on_progress, on_message=on_message)
+    shortcode = "BENCH" + uuid.uuid4().hex[:12]
+    start = time.perf_counter()
+    result = engine.extract_reel_data(f"https://www.instagram.com/reel/{shortcode}/", model)
+    total = time.perf_counter() - start
+
+    timings = {"total": total}
+    for stage, (begin, end) in STAGES.items():
+        if begin in events and end in events:
+            timings[stage] = events[end] - events[begin]
+    # The engine's own error messages say more than the generic result error
+    return result.get("success"), timings, errors[-1] if errors else result.get("error")
+
+
+def run_level(engine_class, concurrency, requests, model):
+    """Run `requests` extractions with `concurrency` in flight"""
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        outcomes = list(pool.map(lambda _: run_one(engine_class, model), range(requests)))
+    wall = time.perf_counter() - start
+
+    stages = {}
+    errors = []
+    for success, timings, error in outcomes:
+        if not success:
+            errors.append((error or "unknown error")[:200])
+            continue
+        for stage, seconds in timings.items():
+            stages.setdefault(stage, []).append(seconds)
+
+    return {
+        "concurrency": concurrency,
+        "requests": requests,
+        "failures": len(errors),
+        "errors": sorted(set(errors)),
+        "wall_seconds": round(wall, 3),
+        "throughput_rps": round((requests - len(errors)) / wall, 3) if wall else None,
+        "stages": {stage: summarize(values) for stage, values in stages.items()},
+    }
+
+
+def compare(report, baseline, tolerance):
+    """List regressions of total p95 or throughput against a baseline report"""
+    previous = {level["concurrency"]: level for level in baseline.get("levels", [])}
+    regressions = []
+    for level in report["levels"]:
+        old = previous.get(level["concurrency"])
+        if not old:
+            continue
+
+        new_p95 = (level["stages"].get("total") or {}).get("p95")
+        old_p95 = (old["stages"].get("total") or {}).get("p95")
+        if new_p95 and old_p95 and new_p95 > old_p95 * (1 + tolerance):
+            regressions.append(f"concurrency {level['concurrency']}: total p95 {old_p95:.3f}s -> {new_p95:.3f}s")
+
+        if level["throughput_rps"] and old["throughput_rps"] and \
+           level["throughput_rps"] < old["throughput_rps"] * (1 - tolerance):
+            regressions.append(f"concurrency {level['concurrency']}: throughput {old['throughput_rps']} -> {level['throughput_rps']} req/s")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline end-to-end benchmark of the extraction pipeline")
+    parser.add_argument("--fixture", action="append", help="MP4 file to serve (repeatable; default: generate one)")
+    parser.add_argument("--concurrency", default="1,4,8", help="Comma-separated concurrency levels")
+    parser.add_argument("--requests", type=int, default=16, help="Extractions per concurrency level")
+    parser.add_argument("--whisper-delay", type=float, default=0.5, help="Seconds the fake Whisper API takes per call")
+    parser.add_argument("--model", default="whisper-1")
+    parser.add_argument("--output", default="bench_results.json", help="Where to write the JSON report")
+    parser.add_argument("--baseline", help="Previous report to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="Allowed regression vs the baseline (0.2 = 20%%)")
+    args = parser.parse_args()
+
+    if not shutil.which('ffmpeg'):
+        print("ffmpeg is required on PATH", file=sys.stderr)
+        return 2
+
+    scratch = tempfile.mkdtemp(prefix='reel-bench-')
+    try:
+        fixtures = [os.path.abspath(f) for f in args.fixture or []] or [make_fixture(scratch)]
+        media = start_server(media_handler(fixtures))
+        whisper = start_server(whisper_handler(args.whisper_delay))
+
+        # Point the engine at the local servers, and keep its caches and
+        # workspaces in the scratch directory
+        os.environ['REEL_SOURCE_URL_TEMPLATE'] = f"http://127.0.0.1:{media.server_port}/media/{{shortcode}}.mp4"
+        os.environ['OPENAI_BASE_URL'] = f"http://127.0.0.1:{whisper.server_port}/v1"
+        os.environ['OPENAI_API_KEY'] = 'sk-bench'
+        os.environ['REEL_TRANSCRIPTION_BACKEND'] = 'openai'
+        os.environ['REEL_CACHE_DIR'] = os.path.join(scratch, 'cache')
+        os.environ['REEL_WORKSPACE_ROOT'] = os.path.join(scratch, 'workspaces')
+        # The fixture server is not Instagram - don't throttle it unless asked to
+        os.environ.setdefault('REEL_INSTAGRAM_RATE', '1000')
+        os.environ.setdefault('REEL_INSTAGRAM_BURST', '1000')
+        os.environ.setdefault('REEL_INSTAGRAM_WORKERS', '64')
+
+        sys.path.insert(0, REPO_ROOT)
+        from reel_engine import ReelTranscriptEngine
+
+        levels = [int(c) for c in args.concurrency.split(',') if c.strip()]
+        report = {
+            "started_at": time.strftime('%Y-%m-%dT%H:%M:%S%z'),
+            "config": {
+                "fixtures": [os.path.basename(f) for f in fixtures],
+                "requests_per_level": args.requests,
+                "whisper_delay": args.whisper_delay,
+                "model": args.model,
+                "python": sys.version.split()[0],
+                "env": {k: v for k, v in os.environ.items() if k.startswith('REEL_') and k != 'REEL_SOURCE_URL_TEMPLATE'},
+            },
+            "levels": [],
+        }
+
+        for concurrency in levels:
+            level = run_level(ReelTranscriptEngine, concurrency, args.requests, args.model)
+            report["levels"].append(level)
+            total = level["stages"].get("total") or {}
+            print(f"concurrency {concurrency:3d}: {level['throughput_rps']} req/s, "
+                  f"p50 {total.get('p50')}s, p95 {total.get('p95')}s, p99 {total.get('p99')}s, "
+                  f"{level['failures']} failed")
+            for error in level["errors"]:
+                print(f"    ! {error}")
+
+        regressions = []
+        if args.baseline:
+            with open(args.baseline) as f:
+                regressions = compare(report, json.load(f), args.tolerance)
+            report["regressions"] = regressions
+            for regression in regressions:
+                print(f"REGRESSION {regression}")
+
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"Report written to {args.output}")
+
+        failed = any(level["failures"] for level in report["levels"])
+        return 1 if regressions or failed else 0
+    finally:
+        shutil.rmtree(scratch, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+"""
+Cold-start import benchmark for the app entry points
+
+Each entry point is imported in a fresh interpreter with `python -X
+importtime` and the per-module import times are parsed from its stderr.
+The run fails (exit code 1) when an entry point imports slower than its
+budget, or when it imports a module that is supposed to be deferred to the
+stage that uses it.
+
+    python benchmarks/cold_start.py
+    python benchmarks/cold_start.py --runs 10 --slack 1.5 --json
+
+Budgets live in benchmarks/cold_start_budget.json:
+
+    {"app_vercel": {"max_import_ms": 1500, "deferred": ["yt_dlp", "pydub"]}}
+"""
+
+import os
+import re
+import sys
+import json
+import argparse
+import statistics
+import subprocess
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_BUDGET = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'cold_start_budget.json')
+
+# "import time:       179 |       6771 |   worker_pool"
+IMPORTTIME_LINE = re.compile(r'^import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)\s*$')
+
+
+def parse_importtime(stderr):
+    """Parse -X importtime output into (depth, module, self_us, cumulative_us) rows"""
+    rows = []
+    for line in stderr.splitlines():
+        match = IMPORTTIME_LINE.match(line)
+        if match:
+            self_us, cumulative_us, indent, module = match.groups()
+            depth = (len(indent) - 1) // 2
+            rows.append((depth, module, int(self_us), int(cumulative_us)))
+    return rows
+
+
+def measure(module):
+    """Import module in a fresh interpreter; return (total_ms, direct imports, all modules)"""
+    env = dict(os.environ, PYTHONPATH=REPO_ROOT + os.pathsep + os.environ.get('PYTHONPATH', ''))
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+        cwd=REPO_ROOT, env=env, capture_output=True, text=True
+    )
+    if result.returncode != 0:
+        last_line = (result.stderr.strip().splitlines() or ['unknown error'])[-1]
+        raise RuntimeError(f"import {module} failed: {last_line}")
+
+    rows = parse_importtime(result.stderr)
+
+    # Children are printed before their parent; the entry point is the last
+    # top-level row with its name
+    end = max(i for i, row in enumerate(rows) if row[0] == 0 and row[1] == module)
+    start = end
+    while start > 0 and rows[start - 1][0] > 0:
+        start -= 1
+
+    direct = {name: cumulative / 1000 for depth, name, _, cumulative in rows[start:end] if depth == 1}
+    loaded = {name for _, name, _, _ in rows[start:end + 1]}
+    return rows[end][3] / 1000, direct, loaded
+
+
+def check(module, budget, runs, slack):
+    """Benchmark one entry point against its budget"""
+    totals = []
+    direct = {}
+    loaded = set()
+    for _ in range(runs):
+        total_ms, direct, loaded = measure(module)
+        totals.append(total_ms)
+
+    median_ms = statistics.median(totals)
+    max_ms = budget.get('max_import_ms')
+    failures = []
+    if max_ms is not None and median_ms > max_ms * slack:
+        failures.append(f"import took {median_ms:.0f} ms, budget is {max_ms * slack:.0f} ms")
+
+    for name in budget.get('deferred', []):
+        eager = sorted(m for m in loaded if m == name or m.startswith(name + '.'))
+        if eager:
+            failures.append(f"{name} is imported at start-up but should be deferred")
+
+    return {
+        "module": module,
+        "median_ms": round(median_ms, 1),
+        "budget_ms": max_ms,
+        "runs_ms": [round(t, 1) for t in totals],
+        "slowest_imports_ms": dict(sorted(((k, round(v, 1)) for k, v in direct.items()), key=lambda kv: -kv[1])[:10]),
+        "failures": failures,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Check entry-point import time against the cold-start budget")
+    parser.add_argument("--budget", default=DEFAULT_BUDGET, help="Budget JSON file")
+    parser.add_argument("--runs", type=int, default=5, help="Fresh interpreters per entry point (median is used)")
+    parser.add_argument("--slack", type=float, default=1.0, help="Multiply every time budget, e.g. for slow CI machines")
+    parser.add_argument("--json", action="store_true", help="Print the report as JSON")
+    parser.add_argument("modules", nargs="*", help="Entry points to check (default: all in the budget)")
+    args = parser.parse_args()
+
+    with open(args.budget) as f:
+        budgets = json.load(f)
+
+    reports = []
+    for module in args.modules or list(budgets):
+        try:
+            reports.append(check(module, budgets.get(module, {}), args.runs, args.slack))
+        except RuntimeError as e:
+            reports.append({"module": module, "failures": [str(e)]})
+
+    if args.json:
+        print(json.dumps(reports, indent=2))
+    else:
+        for report in reports:
+            status = "FAIL" if report["failures"] else "ok"
+            if "median_ms" in report:
+                print(f"{status:4} {report['module']}: {report['median_ms']:.0f} ms (budget {report['budget_ms']} ms)")
+                for name, ms in report["slowest_imports_ms"].items():
+                    print(f"       {ms:8.1f} ms  {name}")
+            else:
+                print(f"{status:4} {report['module']}")
+            for failure in report["failures"]:
+                print(f"       ! {failure}")
+
+    return 1 if any(r["failures"] for r in reports) else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
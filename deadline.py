@@ -0,0 +1,70 @@
+"""
+One time budget per extraction job
+
+A Deadline is created when a job starts (REEL_JOB_DEADLINE_SECONDS, or
+per request) and handed to every stage. Stages keep their usual timeouts
+but never wait longer than what is left of the budget:
+
+    socket_timeout = deadline.timeout(120)   # min(120, remaining)
+
+When nothing is left, timeout() and check() raise DeadlineExceeded and
+the job stops with a clean failure instead of holding a worker.
+"""
+
+import os
+import math
+import time
+
+DEFAULT_JOB_SECONDS = 600
+
+
+class DeadlineExceeded(Exception):
+    """Raised when a job has used up its time budget"""
+
+
+class Deadline:
+    """Absolute point in time a job must finish by; unbounded when seconds is None"""
+
+    def __init__(self, seconds=None):
+        self.seconds = seconds
+        self.expires_at = time.monotonic() + seconds if seconds is not None else None
+
+    @classmethod
+    def for_job(cls, seconds=None):
+        """Deadline for a new job
+
+        REEL_JOB_DEADLINE_SECONDS (0 = none) is the budget; a requested
+        `seconds` (e.g. how long the client will wait) can only shorten it.
+        Requests that are not a positive, finite number are ignored.
+        """
+        budget = float(os.getenv('REEL_JOB_DEADLINE_SECONDS', DEFAULT_JOB_SECONDS) or 0)
+        if seconds is not None and math.isfinite(seconds) and seconds > 0:
+            budget = min(budget, seconds) if budget > 0 else seconds
+        return cls(budget if budget > 0 else None)
+
+    def remaining(self):
+        """Seconds left, or None without a deadline"""
+        if self.expires_at is None:
+            return None
+        return max(0.0, self.expires_at - time.monotonic())
+
+    def expired(self):
+        return self.expires_at is not None and time.monotonic() >= self.expires_at
+
+    def check(self, stage):
+        """Raise DeadlineExceeded if the budget is used up"""
+        if self.expired():
+            raise DeadlineExceeded(f"Job deadline of {self.seconds:g}s exceeded during {stage}")
+
+    def timeout(self, default, stage='this stage', share=1.0):
+        """Timeout for a stage: its default, capped at `share` of the remaining budget
+
+        default may be None (no timeout of its own). Raises DeadlineExceeded
+        when nothing is left.
+        """
+        remaining = self.remaining()
+        if remaining is None:
+            return default
+        self.check(stage)
+        budget = remaining * share
+        return budget if default is None else min(default, budget)
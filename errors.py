@@ -0,0 +1,85 @@
+"""
+Failure taxonomy for Instagram downloads and transcription API calls
+
+Every failure is one of:
+
+    permanent     - retrying cannot help (deleted or private reel, 404,
+                    bad API key, rejected audio); fail at once
+    rate_limited  - the other side is throttling us; back off process-wide
+    transient     - network blips, timeouts, 5xx; retry with backoff
+
+Rate-limit markers are checked first: Instagram's throttling message
+("Requested content is not available, rate-limit reached or login
+required") also reads like a permanent one. Only that explicit throttling
+text counts - a plain "not available" or login wall is a dead reel.
+"""
+
+import re
+from deadline import DeadlineExceeded
+
+PERMANENT = 'permanent'
+RATE_LIMITED = 'rate_limited'
+TRANSIENT = 'transient'
+
+RATE_LIMIT_PATTERNS = (
+    'rate-limit reached', 'rate limit', 'too many requests', 'http error 429', 'please wait a few minutes',
+)
+
+# (pattern, reason) - the reason is shown to users and stored in the negative cache
+PERMANENT_PATTERNS = (
+    (r'private (account|video|profile|post|reel)|(account|video|profile|post|reel|content) is private',
+     "The reel belongs to a private account"),
+    (r'login required|log in to (see|view|watch)', "The reel is only visible to logged-in users"),
+    (r'(has been|was) (removed|deleted)|no longer (available|exists)|does not exist|media not found',
+     "The reel was deleted or does not exist"),
+    (r'http error 404|http error 410|page not found', "The reel was not found"),
+    (r'unsupported url|not a valid url|invalid instagram url', "The URL is not a supported Instagram reel"),
+    (r'there is no video in this post|no video formats found', "The post has no video"),
+    (r"(?<!format is )not available|isn't available", "The reel is not available"),
+    (r'file too large|larger than max-filesize|exceeded its .* quota', "The media is too large to process"),
+)
+
+# API errors carry an HTTP status; these never succeed on retry
+PERMANENT_STATUS = {400, 401, 403, 404, 413, 415, 422}
+PERMANENT_API_CODES = {'insufficient_quota', 'invalid_api_key', 'model_not_found'}
+
+
+def classify(error):
+    """Return PERMANENT, RATE_LIMITED or TRANSIENT for an exception or message"""
+    if isinstance(error, DeadlineExceeded):
+        return PERMANENT  # A job out of time cannot be helped by retrying
+
+    # OpenAI (and other httpx-based) API errors expose the HTTP status
+    status = getattr(error, 'status_code', None)
+    if status is not None:
+        if getattr(error, 'code', None) in PERMANENT_API_CODES:
+            return PERMANENT
+        if status == 429:
+            return RATE_LIMITED
+        if status in PERMANENT_STATUS:
+            return PERMANENT
+        return TRANSIENT
+
+    message = str(error).lower()
+    if any(marker in message for marker in RATE_LIMIT_PATTERNS):
+        return RATE_LIMITED
+    if permanent_reason(message):
+        return PERMANENT
+    return TRANSIENT
+
+
+def permanent_reason(error):
+    """Human-readable reason for a permanent failure, or None"""
+    message = str(error).lower()
+    for pattern, reason in PERMANENT_PATTERNS:
+        if re.search(pattern, message):
+            return reason
+    return None
+
+
+def worst(kinds):
+    """The kind to report for a stage that failed with several errors"""
+    for kind in (PERMANENT, RATE_LIMITED):
+        if kind in kinds:
+            return kind
+    return TRANSIENT
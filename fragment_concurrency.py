@@ -0,0 +1,142 @@
+"""
+Adaptive concurrency for fragmented (HLS/DASH) downloads
+
+yt-dlp fixes concurrent_fragment_downloads when a download starts, so the
+controller adapts between downloads instead of within one. Each fragmented
+download reports its throughput through a progress hook:
+
+- more throughput than any lower level managed -> one more worker
+- clearly less than a lower level managed -> halve the workers
+- a fragment error -> serial downloads for REEL_FRAGMENT_SERIAL_COOLDOWN
+  seconds, then resume from half the previous level
+
+Only fragment and HTTP/network errors count as fragment errors; rate
+limits, permanent failures and cancelled downloads (e.g. the loser of a
+hedged race) leave the level alone. Downloads that turn out not to be
+fragmented are ignored. Fragment files
+land next to the output template, i.e. inside the job workspace.
+
+Enabled with REEL_FRAGMENT_MODE=adaptive; the default (serial) keeps one
+fragment at a time.
+"""
+
+import os
+import re
+import time
+import threading
+import errors
+
+DEFAULT_MAX_CONCURRENCY = 8
+DEFAULT_INITIAL_CONCURRENCY = 2
+DEFAULT_SERIAL_COOLDOWN = 300  # Seconds of serial downloads after a fragment error
+THROUGHPUT_ALPHA = 0.3  # Weight of the newest sample in the per-level average
+SIGNIFICANT_CHANGE = 0.1  # Throughput must move 10% to count as a gain or a loss
+
+# yt-dlp errors that mean fetching fragments failed, not that the reel did
+FRAGMENT_ERROR_PATTERN = re.compile(
+    r'fragment|http error 5\d\d|timed out|connection (reset|refused|aborted)|incomplete read|remote end closed'
+)
+
+
+def is_fragment_error(error):
+    """Whether a failed fragmented download should back the fan-out off"""
+    if type(error).__name__ == 'DownloadCancelled':
+        return False
+    return errors.classify(error) == errors.TRANSIENT and bool(FRAGMENT_ERROR_PATTERN.search(str(error).lower()))
+
+
+class FragmentConcurrency:
+    """Process-wide AIMD controller for concurrent_fragment_downloads"""
+
+    def __init__(self, maximum=None, initial=None, serial_cooldown=None):
+        self.maximum = maximum or int(os.getenv('REEL_FRAGMENT_MAX_CONCURRENCY', DEFAULT_MAX_CONCURRENCY))
+        self.level = min(self.maximum, initial or int(os.getenv('REEL_FRAGMENT_INITIAL_CONCURRENCY',
+                                                                 DEFAULT_INITIAL_CONCURRENCY)))
+        self.serial_cooldown = serial_cooldown if serial_cooldown is not None else \
+            float(os.getenv('REEL_FRAGMENT_SERIAL_COOLDOWN', DEFAULT_SERIAL_COOLDOWN))
+        self.throughput = {}  # level -> smoothed bytes per second
+        self.serial_until = 0.0
+        self._lock = threading.Lock()
+
+    def current(self):
+        """Concurrency the next download should use"""
+        with self._lock:
+            return 1 if time.monotonic() < self.serial_until else self.level
+
+    def track(self):
+        """Start tracking one download; see FragmentRun"""
+        return FragmentRun(self, self.current())
+
+    def record(self, concurrency, nbytes, seconds):
+        """Feed a finished fragmented download into the controller"""
+        if not nbytes or not seconds or seconds <= 0:
+            return
+        sample = nbytes / seconds
+        with self._lock:
+            previous = self.throughput.get(concurrency)
+            self.throughput[concurrency] = sample if previous is None else \
+                (1 - THROUGHPUT_ALPHA) * previous + THROUGHPUT_ALPHA * sample
+            if concurrency != self.level:
+                return  # Started before the last change (or during a serial spell)
+
+            current = self.throughput[concurrency]
+            below = max((v for level, v in self.throughput.items() if level < concurrency), default=None)
+            if below is None or current > below * (1 + SIGNIFICANT_CHANGE):
+                self.level = min(self.maximum, concurrency + 1)  # Additive increase
+            elif current < below * (1 - SIGNIFICANT_CHANGE):
+                self.level = max(1, concurrency // 2)  # Multiplicative decrease
+
+    def fragment_error(self):
+        """A fragmented download failed: go serial for a while"""
+        with self._lock:
+            self.serial_until = time.monotonic() + self.serial_cooldown
+            self.level = max(1, self.level // 2)
+
+
+class FragmentRun:
+    """One download's view of the controller
+
+        run = controller.track()
+        ydl_opts['concurrent_fragment_downloads'] = run.concurrency
+        ydl_opts['progress_hooks'] = [run.hook]
+        ...
+        run.finish(ok, error)
+    """
+
+    def __init__(self, controller, concurrency):
+        self.controller = controller
+        self.concurrency = concurrency
+        self.fragmented = False
+        self.bytes = 0
+        self.seconds = 0.0
+
+    def hook(self, status):
+        """yt-dlp progress hook"""
+        if status.get('fragment_count') or status.get('fragment_index') is not None:
+            self.fragmented = True
+        if status.get('status') == 'finished':
+            self.bytes += status.get('total_bytes') or status.get('downloaded_bytes') or 0
+            self.seconds += status.get('elapsed') or 0
+
+    def finish(self, ok, error=None):
+        if not self.fragmented:
+            return
+        if ok:
+            self.controller.record(self.concurrency, self.bytes, self.seconds)
+        elif error is not None and is_fragment_error(error):
+            self.controller.fragment_error()
+
+
+_controller = None
+_controller_lock = threading.Lock()
+
+
+def get_fragment_controller():
+    """Return the process-wide controller, or None when fragments are fetched serially"""
+    global _controller
+    if os.getenv('REEL_FRAGMENT_MODE', 'serial').strip().lower() != 'adaptive':
+        return None
+    with _controller_lock:
+        if _controller is None:
+            _controller = FragmentConcurrency()
+        return _controller
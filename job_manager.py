@@ -0,0 +1,134 @@
+"""
+Background extraction jobs
+
+JobManager runs extract_reel_data on a worker pool and records every
+engine stage transition as an event, so web front-ends can return a job id
+immediately and let clients poll or stream progress.
+"""
+
+import os
+import time
+import uuid
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+DEFAULT_JOB_WORKERS = 4
+DEFAULT_JOB_TTL = 3600  # Finished jobs are forgotten after an hour
+
+JOB_QUEUED = "queued"
+JOB_RUNNING = "running"
+JOB_SUCCEEDED = "succeeded"
+JOB_FAILED = "failed"
+
+
+class Job:
+    def __init__(self, url, model):
+        self.id = uuid.uuid4().hex
+        self.url = url
+        self.model = model
+        self.status = JOB_QUEUED
+        self.stage = None
+        self.percent = 0
+        self.result = None
+        self.events = []
+        self.created_at = time.time()
+        self.finished_at = None
+        self.changed = threading.Condition()
+
+    @property
+    def done(self):
+        return self.status in (JOB_SUCCEEDED, JOB_FAILED)
+
+    def add_event(self, event, **data):
+        """Record an event and wake everyone waiting on this job"""
+        with self.changed:
+            self.events.append({"id": len(self.events), "event": event, "time": time.time(), **data})
+            self.changed.notify_all()
+
+    def finish(self, result):
+        """Record the result and the terminal event at once
+
+        A reader that sees the job done always finds its succeeded/failed
+        event too.
+        """
+        with self.changed:
+            self.result = result
+            self.finished_at = time.time()
+            self.status = JOB_SUCCEEDED if result.get("success") else JOB_FAILED
+            self.add_event(self.status, status=self.status, error=result.get("error"))
+
+    def wait_for_events(self, after, timeout):
+        """Return events with id >= after, waiting up to timeout for new ones"""
+        with self.changed:
+            if len(self.events) <= after and not self.done:
+                self.changed.wait(timeout)
+            return self.events[after:]
+
+    def to_dict(self, include_result=True):
+        data = {
+            "job_id": self.id,
+            "url": self.url,
+            "model": self.model,
+            "status": self.status,
+            "stage": self.stage,
+            "percent": self.percent,
+            "created_at": self.created_at,
+            "finished_at": self.finished_at,
+        }
+        if include_result and self.done:
+            data["result"] = self.result
+        return data
+
+
+class JobManager:
+    """Runs extraction jobs in the background and tracks their progress"""
+
+    def __init__(self, engine_factory, workers=None, ttl=None):
+        self.engine_factory = engine_factory
+        self.ttl = ttl if ttl is not None else int(os.getenv('REEL_JOB_TTL', DEFAULT_JOB_TTL))
+        self._jobs = {}
+        self._lock = threading.Lock()
+        self._pool = ThreadPoolExecutor(
+            max_workers=workers or int(os.getenv('REEL_JOB_WORKERS', DEFAULT_JOB_WORKERS)),
+            thread_name_prefix='reel-job'
+        )
+
+    def submit(self, url, model="whisper-1"):
+        """Queue a job and return it immediately"""
+        job = Job(url, model)
+        with self._lock:
+            self._prune()
+            self._jobs[job.id] = job
+        job.add_event(JOB_QUEUED, status=JOB_QUEUED)
+        self._pool.submit(self._run, job)
+        return job
+
+    def get(self, job_id):
+        """Return a job by id, or None"""
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def _run(self, job):
+        def on_progress(stage, percent, message):
+            job.stage = stage
+            job.percent = percent
+            job.add_event(stage, stage=stage, percent=percent, message=message)
+
+        def on_message(level, message):
+            job.add_event("message", level=level, message=message)
+
+        job.status = JOB_RUNNING
+        job.add_event(JOB_RUNNING, status=JOB_RUNNING)
+        try:
+            engine = self.engine_factory(on_progress=on_progress, on_message=on_message)
+            result = engine.extract_reel_data(job.url, job.model)
+        except Exception as e:
+            result = {"success": False, "error": str(e), "data": None}
+
+        job.finish(result)
+
+    def _prune(self):
+        """Forget finished jobs older than the TTL (caller holds the lock)"""
+        cutoff = time.time() - self.ttl
+        for job_id in [j.id for j in self._jobs.values() if j.done and j.finished_at < cutoff]:
+            del self._jobs[job_id]
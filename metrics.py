@@ -0,0 +1,120 @@
+"""
+Prometheus metrics for the extraction pipeline
+
+Per-stage latency histograms plus counters for bytes, retries, rate-limit
+hits and cache hits. Without prometheus_client installed every metric is a
+no-op, so instrumented code never needs to check.
+
+Front-ends expose the metrics with metrics_response() (Flask /metrics) or
+start_metrics_server() (a sidecar HTTP port for Streamlit, REEL_METRICS_PORT).
+Worker processes keep their own counters; set PROMETHEUS_MULTIPROC_DIR to
+aggregate them (see the prometheus_client multiprocess docs).
+"""
+
+import os
+import time
+import threading
+from contextlib import contextmanager
+
+try:
+    import prometheus_client
+except ImportError:
+    prometheus_client = None
+
+# Reels take seconds to minutes per stage
+STAGE_BUCKETS = (0.1, 0.25, 0.5, 1, 2.5, 5, 10, 20, 30, 60, 120, 300, 600)
+
+
+class _NoopMetric:
+    """Stands in for every metric type when prometheus_client is missing"""
+
+    def labels(self, *args, **kwargs):
+        return self
+
+    def inc(self, amount=1):
+        pass
+
+    def observe(self, value):
+        pass
+
+
+def _metric(kind, name, documentation, labelnames=(), **kwargs):
+    if prometheus_client is None:
+        return _NoopMetric()
+    return getattr(prometheus_client, kind)(name, documentation, labelnames, **kwargs)
+
+
+STAGE_SECONDS = _metric('Histogram', 'reel_stage_seconds', 'Time spent in each pipeline stage',
+                        ['stage'], buckets=STAGE_BUCKETS)
+STAGE_FAILURES = _metric('Counter', 'reel_stage_failures_total', 'Pipeline stages that failed', ['stage'])
+JOB_SECONDS = _metric('Histogram', 'reel_job_seconds', 'End-to-end extraction time',
+                      ['outcome'], buckets=STAGE_BUCKETS)
+JOBS = _metric('Counter', 'reel_jobs_total', 'Extraction requests by outcome', ['outcome'])
+DOWNLOAD_BYTES = _metric('Counter', 'reel_download_bytes_total', 'Media bytes downloaded from Instagram')
+UPLOAD_BYTES = _metric('Counter', 'reel_upload_bytes_total', 'Audio bytes sent for transcription')
+RETRIES = _metric('Counter', 'reel_instagram_retries_total', 'Instagram requests retried after a failure')
+RATE_LIMIT_HITS = _metric('Counter', 'reel_rate_limit_hits_total', 'Rate-limit responses from Instagram')
+CACHE_LOOKUPS = _metric('Counter', 'reel_cache_lookups_total', 'Cache lookups', ['cache', 'result'])
+DOWNLOAD_WINS = _metric('Counter', 'reel_download_wins_total', 'Hedged downloads by the strategy that won',
+                        ['strategy'])
+
+
+class _Stage:
+    failed = False
+
+
+@contextmanager
+def stage(name):
+    """Time a pipeline stage; set .failed on the yielded object to count a failure
+
+        with metrics.stage('download') as s:
+            path = download()
+            s.failed = not path
+    """
+    current = _Stage()
+    start = time.perf_counter()
+    try:
+        yield current
+    except BaseException:
+        current.failed = True
+        raise
+    finally:
+        STAGE_SECONDS.labels(name).observe(time.perf_counter() - start)
+        if current.failed:
+            STAGE_FAILURES.labels(name).inc()
+
+
+def cache_lookup(cache, hit):
+    """Count a cache hit or miss"""
+    CACHE_LOOKUPS.labels(cache, 'hit' if hit else 'miss').inc()
+
+
+def metrics_response():
+    """Return (body, content type) for a /metrics endpoint"""
+    if prometheus_client is None:
+        return b"# prometheus_client is not installed\n", "text/plain; charset=utf-8"
+
+    registry = prometheus_client.REGISTRY
+    if os.getenv('PROMETHEUS_MULTIPROC_DIR'):
+        from prometheus_client import multiprocess
+        registry = prometheus_client.CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    return prometheus_client.generate_latest(registry), prometheus_client.CONTENT_TYPE_LATEST
+
+
+_server_started = False
+_server_lock = threading.Lock()
+
+
+def start_metrics_server(port=None):
+    """Serve /metrics on a side port once per process; returns the port or None"""
+    global _server_started
+    port = port or int(os.getenv('REEL_METRICS_PORT', '0') or 0)
+    if not port or prometheus_client is None:
+        return None
+
+    with _server_lock:
+        if not _server_started:
+            prometheus_client.start_http_server(port)
+            _server_started = True
+    return port
@@ -0,0 +1,77 @@
+"""
+Process-wide OpenAI client
+
+Every engine in a process (Streamlit sessions, Flask requests, background
+jobs, chunk transcription threads) shares one HTTP connection pool to the
+API, so TLS handshakes happen once per connection instead of once per job
+and the number of open sockets stays bounded.
+
+HTTP/2 is used when the optional 'h2' package is installed
+(pip install 'httpx[http2]') and REEL_OPENAI_HTTP2 is not disabled.
+"""
+
+import os
+import threading
+
+DEFAULT_MAX_CONNECTIONS = 32
+DEFAULT_MAX_KEEPALIVE = 16
+DEFAULT_KEEPALIVE_EXPIRY = 120  # Seconds an idle connection is kept open
+DEFAULT_CONNECT_TIMEOUT = 10
+DEFAULT_TIMEOUT = 300  # Long uploads can take minutes to transcribe
+
+_http_client = None
+_clients = {}
+_lock = threading.Lock()
+
+
+def _http2_available():
+    """Check whether httpx can speak HTTP/2 here"""
+    try:
+        import h2  # noqa: F401
+        return True
+    except ImportError:
+        return False
+
+
+def build_http_client():
+    """Create the pooled HTTP client from the REEL_OPENAI_* settings"""
+    # Limits and timeouts must come from the HTTP library the SDK is built on
+    try:
+        import httpx2 as httpx
+        from openai import DefaultHttpx2Client as DefaultHttpxClient
+    except ImportError:
+        import httpx
+        try:
+            from openai import DefaultHttpxClient
+        except ImportError:  # openai < 1.17 - plain httpx client
+            DefaultHttpxClient = httpx.Client
+
+    limits = httpx.Limits(
+        max_connections=int(os.getenv('REEL_OPENAI_MAX_CONNECTIONS', DEFAULT_MAX_CONNECTIONS)),
+        max_keepalive_connections=int(os.getenv('REEL_OPENAI_MAX_KEEPALIVE', DEFAULT_MAX_KEEPALIVE)),
+        keepalive_expiry=float(os.getenv('REEL_OPENAI_KEEPALIVE_EXPIRY', DEFAULT_KEEPALIVE_EXPIRY)),
+    )
+    timeout = httpx.Timeout(
+        float(os.getenv('REEL_OPENAI_TIMEOUT', DEFAULT_TIMEOUT)),
+        connect=float(os.getenv('REEL_OPENAI_CONNECT_TIMEOUT', DEFAULT_CONNECT_TIMEOUT)),
+    )
+    http2 = os.getenv('REEL_OPENAI_HTTP2', '1').lower() in ('1', 'true', 'yes') and _http2_available()
+    return DefaultHttpxClient(limits=limits, timeout=timeout, http2=http2)
+
+
+def get_shared_client(api_key):
+    """Return the process-wide OpenAI client for an API key
+
+    Clients for different keys share the same connection pool. OpenAI
+    clients are thread-safe, so callers never need their own.
+    """
+    global _http_client
+    from openai import OpenAI  # Deferred - the SDK is slow to import
+
+    with _lock:
+        client = _clients.get(api_key)
+        if client is None:
+            if _http_client is None:
+                _http_client = build_http_client()
+            client = _clients[api_key] = OpenAI(api_key=api_key, http_client=_http_client)
+        return client
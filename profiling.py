@@ -0,0 +1,223 @@
+"""
+On-demand profiling of single extractions
+
+Two modes:
+
+    cprofile - deterministic cProfile of the calling thread, saved as .pstats
+               (open with `python -m pstats` or snakeviz)
+    sample   - a wall-clock sampler over the job's own threads, saved as a
+               speedscope .json (open at https://www.speedscope.app)
+
+The sampler follows the calling thread plus any thread running work the
+job handed off with carry() (scheduler, race and chunk threads), while it
+runs that work - other requests in the process stay out of the profile.
+
+Both measure wall time, so waiting on ffmpeg and on the network shows up
+as time spent in the blocking call. Work handed to REEL_WORKER_PROCESSES
+shows only as the wait for its result. Profiles go to REEL_PROFILE_DIR;
+only the newest REEL_PROFILE_KEEP are kept.
+
+Enable globally with REEL_PROFILE=cprofile|sample. Per Flask request (an
+`X-Reel-Profile` header or `?profile=` query flag) and the /profiles pages
+need REEL_PROFILE_TOKEN, sent as `X-Reel-Profile-Token` or `?profile_token=`;
+without it they are off. When not profiling, carry() is a no-op.
+"""
+
+import os
+import re
+import sys
+import time
+import json
+import hmac
+import uuid
+import threading
+from collections import Counter
+from reel_cache import cache_root
+
+MODES = ('cprofile', 'sample')
+DEFAULT_KEEP = 50
+DEFAULT_SAMPLE_INTERVAL_MS = 5
+
+
+def profile_dir():
+    """Directory profiles are written to"""
+    return os.getenv('REEL_PROFILE_DIR', os.path.join(cache_root(), 'profiles'))
+
+
+def parse_mode(value):
+    """Turn a flag value ('1', 'sample', 'cprofile', ...) into a mode or None"""
+    value = (value or '').strip().lower()
+    if value in ('', '0', 'false', 'no', 'off'):
+        return None
+    return value if value in MODES else 'cprofile'
+
+
+def global_mode():
+    """Profiling mode switched on for every extraction by REEL_PROFILE"""
+    return parse_mode(os.getenv('REEL_PROFILE'))
+
+
+def token_ok(supplied):
+    """Whether a client may profile requests and read profiles (REEL_PROFILE_TOKEN)"""
+    token = os.getenv('REEL_PROFILE_TOKEN')
+    return bool(token) and bool(supplied) and hmac.compare_digest(token.encode('utf-8'), supplied.encode('utf-8'))
+
+
+_local = threading.local()
+
+
+def current():
+    """The sampler profiling this thread's job, or None"""
+    return getattr(_local, 'sampler', None)
+
+
+def carry(fn, sampler=None):
+    """Wrap fn so that, wherever it runs, it counts towards this thread's profile"""
+    sampler = sampler or current()
+    if sampler is None:
+        return fn
+
+    def run(*args, **kwargs):
+        previous = current()
+        _local.sampler = sampler
+        sampler.follow(threading.get_ident())
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            sampler.unfollow(threading.get_ident())
+            _local.sampler = previous
+    return run
+
+
+def run_profiled(mode, label, fn, *args, **kwargs):
+    """Run fn under the profiler; returns (result, profile file name)"""
+    os.makedirs(profile_dir(), exist_ok=True)
+    safe_label = re.sub(r'[^A-Za-z0-9_-]+', '_', label)[:60] or 'extract'
+    base = f"{time.strftime('%Y%m%d-%H%M%S')}-{safe_label}-{uuid.uuid4().hex[:6]}-{mode}"
+
+    if mode == 'sample':
+        sampler = _Sampler(int(os.getenv('REEL_PROFILE_INTERVAL_MS', DEFAULT_SAMPLE_INTERVAL_MS)) / 1000)
+        sampler.start()
+        try:
+            result = carry(fn, sampler)(*args, **kwargs)
+        finally:
+            sampler.stop()
+            name = base + '.speedscope.json'
+            with open(os.path.join(profile_dir(), name), 'w') as f:
+                json.dump(sampler.to_speedscope(label), f)
+    else:
+        import cProfile
+        profiler = cProfile.Profile()
+        profiler.enable()
+        try:
+            result = fn(*args, **kwargs)
+        finally:
+            profiler.disable()
+            name = base + '.pstats'
+            profiler.dump_stats(os.path.join(profile_dir(), name))
+
+    _prune()
+    return result, name
+
+
+def list_profiles(limit=50):
+    """Newest profiles first, as dicts with name, size and created time"""
+    try:
+        entries = [e for e in os.scandir(profile_dir()) if e.is_file() and e.name.endswith(('.pstats', '.json'))]
+    except OSError:
+        return []
+    entries.sort(key=lambda e: e.stat().st_mtime, reverse=True)
+    return [
+        {"name": e.name, "size": e.stat().st_size, "created": e.stat().st_mtime}
+        for e in entries[:limit]
+    ]
+
+
+def _prune():
+    """Keep only the newest REEL_PROFILE_KEEP profiles"""
+    keep = int(os.getenv('REEL_PROFILE_KEEP', DEFAULT_KEEP))
+    for profile in list_profiles(limit=None)[keep:]:
+        try:
+            os.remove(os.path.join(profile_dir(), profile["name"]))
+        except OSError:
+            pass
+
+
+class _Sampler:
+    """Samples the stacks of the followed threads at a fixed wall-clock interval"""
+
+    def __init__(self, interval):
+        self.interval = interval
+        self.frames = []  # Shared speedscope frame table
+        self._frame_index = {}
+        self.samples = {}  # thread name -> [(stack, weight)]
+        self._followed = Counter()  # thread ident -> nesting depth of carried work
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name='profile-sampler', daemon=True)
+
+    def follow(self, ident):
+        with self._lock:
+            self._followed[ident] += 1
+
+    def unfollow(self, ident):
+        with self._lock:
+            self._followed[ident] -= 1
+            if self._followed[ident] <= 0:
+                del self._followed[ident]
+
+    def start(self):
+        self.started = time.perf_counter()
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+        self.stopped = time.perf_counter()
+
+    def _frame_id(self, code):
+        key = (code.co_name, code.co_filename, code.co_firstlineno)
+        index = self._frame_index.get(key)
+        if index is None:
+            index = self._frame_index[key] = len(self.frames)
+            self.frames.append({"name": code.co_name, "file": code.co_filename, "line": code.co_firstlineno})
+        return index
+
+    def _run(self):
+        last = time.perf_counter()
+        while not self._stop.wait(self.interval):
+            now = time.perf_counter()
+            names = {t.ident: t.name for t in threading.enumerate()}
+            with self._lock:
+                followed = set(self._followed)
+            for ident, frame in sys._current_frames().items():
+                if ident not in followed:
+                    continue
+                stack = []
+                while frame is not None:
+                    stack.append(self._frame_id(frame.f_code))
+                    frame = frame.f_back
+                stack.reverse()  # speedscope wants root first
+                self.samples.setdefault(names.get(ident, str(ident)), []).append((stack, now - last))
+            last = now
+
+    def to_speedscope(self, label):
+        duration = self.stopped - self.started
+        return {
+            "$schema": "https://www.speedscope.app/file-format-schema.json",
+            "name": label,
+            "exporter": "instagram-reel-transcript-extractor",
+            "activeProfileIndex": 0,
+            "shared": {"frames": self.frames},
+            "profiles": [
+                {
+                    "type": "sampled",
+                    "name": thread,
+                    "unit": "seconds",
+                    "startValue": 0,
+                    "endValue": duration,
+                    "samples": [stack for stack, _ in samples],
+                    "weights": [weight for _, weight in samples],
+                } for thread, samples in self.samples.items()
+            ],
+        }
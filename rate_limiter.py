@@ -0,0 +1,315 @@
+"""
+Process-wide scheduler for Instagram requests
+
+All Instagram fetches in a process go through one scheduler:
+
+- a token bucket per egress (proxy / source address) caps the request rate
+- a rate-limit signal from any job puts the whole process in a cooldown
+- retries use jittered exponential backoff
+
+Jobs waiting for a token, a cooldown or a backoff are parked in a heap and
+hold no thread; a single dispatcher thread hands ready jobs to a small
+worker pool.
+
+Worker processes (see worker_pool) share one token bucket and cooldown
+through SharedLimits, so N workers together stay within REEL_INSTAGRAM_RATE
+and a rate limit seen by any of them slows all of them.
+"""
+
+import os
+import heapq
+import random
+import threading
+import time
+import itertools
+from concurrent.futures import Future, ThreadPoolExecutor, InvalidStateError
+import metrics
+import errors
+
+DEFAULT_RATE = 0.5  # Requests per second per egress
+DEFAULT_BURST = 3
+DEFAULT_WORKERS = 4
+DEFAULT_BASE_DELAY = 10  # Seconds, doubled on each retry
+DEFAULT_COOLDOWN = 30  # Seconds the process backs off after a rate-limit signal
+MAX_COOLDOWN = 600
+
+
+def is_rate_limit_error(error):
+    """Check whether an error message means Instagram is throttling us"""
+    return errors.classify(error) == errors.RATE_LIMITED
+
+
+class TokenBucket:
+    """Classic token bucket; not thread-safe on its own (the scheduler locks)"""
+
+    def __init__(self, rate, capacity):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+
+    def _refill(self, now):
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def try_take(self, now):
+        """Take a token, or return how many seconds until one is available"""
+        self._refill(now)
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return 0.0
+        return (1 - self.tokens) / self.rate
+
+
+class LocalLimits:
+    """Token buckets (one per egress) and the cooldown of a single process"""
+
+    def __init__(self, rate, burst):
+        self.rate = rate
+        self.burst = burst
+        self._buckets = {}
+        self._cooldown_until = 0.0
+        self._strikes = 0  # Consecutive rate-limit signals, drives the cooldown length
+        self._lock = threading.Lock()
+
+    def try_take(self, egress, now):
+        """Take a token, or return how many seconds until one is available"""
+        with self._lock:
+            bucket = self._buckets.setdefault(egress, TokenBucket(self.rate, self.burst))
+            return bucket.try_take(now)
+
+    def cooldown_until(self):
+        return self._cooldown_until
+
+    def strike(self, cooldown):
+        """Extend the cooldown after a rate-limit signal, longer on each in a row"""
+        with self._lock:
+            self._strikes += 1
+            delay = min(MAX_COOLDOWN, cooldown * (2 ** (self._strikes - 1)))
+            self._cooldown_until = max(self._cooldown_until, time.monotonic() + _jitter(delay))
+
+    def reset_strikes(self):
+        with self._lock:
+            self._strikes = 0
+
+
+class SharedLimits:
+    """One token bucket and cooldown in shared memory, for a pool of processes
+
+    Created in the parent and handed to spawned workers. Every process uses
+    the same bucket whatever its egress - the workers share the parent's.
+    time.monotonic() is system-wide, so timestamps compare across processes.
+    """
+
+    TOKENS, UPDATED, COOLDOWN_UNTIL, STRIKES = range(4)
+
+    def __init__(self, ctx, rate=None, burst=None):
+        self.rate = rate or float(os.getenv('REEL_INSTAGRAM_RATE', DEFAULT_RATE))
+        self.burst = burst or int(os.getenv('REEL_INSTAGRAM_BURST', DEFAULT_BURST))
+        self._state = ctx.Array('d', [self.burst, time.monotonic(), 0.0, 0.0])
+
+    def try_take(self, egress, now):
+        with self._state.get_lock():
+            state = self._state
+            tokens = min(self.burst, state[self.TOKENS] + (now - state[self.UPDATED]) * self.rate)
+            state[self.UPDATED] = max(now, state[self.UPDATED])
+            if tokens >= 1:
+                state[self.TOKENS] = tokens - 1
+                return 0.0
+            state[self.TOKENS] = tokens
+            return (1 - tokens) / self.rate
+
+    def cooldown_until(self):
+        return self._state[self.COOLDOWN_UNTIL]
+
+    def strike(self, cooldown):
+        with self._state.get_lock():
+            state = self._state
+            state[self.STRIKES] += 1
+            delay = min(MAX_COOLDOWN, cooldown * (2 ** (state[self.STRIKES] - 1)))
+            state[self.COOLDOWN_UNTIL] = max(state[self.COOLDOWN_UNTIL], time.monotonic() + _jitter(delay))
+
+    def reset_strikes(self):
+        with self._state.get_lock():
+            self._state[self.STRIKES] = 0
+
+
+class _Job:
+    def __init__(self, fn, egress, max_attempts, on_retry, respect_cooldown):
+        self.fn = fn
+        self.egress = egress
+        self.max_attempts = max_attempts
+        self.on_retry = on_retry
+        self.respect_cooldown = respect_cooldown
+        self.attempt = 0
+        self.future = Future()
+
+
+class InstagramScheduler:
+    """Rate-limit-aware scheduler shared by every job in the process"""
+
+    def __init__(self, rate=None, burst=None, workers=None, base_delay=None, cooldown=None, limits=None):
+        self.rate = rate or float(os.getenv('REEL_INSTAGRAM_RATE', DEFAULT_RATE))
+        self.burst = burst or int(os.getenv('REEL_INSTAGRAM_BURST', DEFAULT_BURST))
+        self.base_delay = base_delay if base_delay is not None else DEFAULT_BASE_DELAY
+        self.cooldown = cooldown if cooldown is not None else int(os.getenv('REEL_RATE_LIMIT_COOLDOWN', DEFAULT_COOLDOWN))
+        # Token buckets and cooldown; SharedLimits when they span processes
+        self.limits = limits or LocalLimits(self.rate, self.burst)
+
+        self._parked = []  # Heap of (ready_at, seq, job)
+        self._exempt = []  # Same, for jobs that ignore the cooldown
+        self._seq = itertools.count()
+        self._cond = threading.Condition()
+        self._pool = ThreadPoolExecutor(
+            max_workers=workers or int(os.getenv('REEL_INSTAGRAM_WORKERS', DEFAULT_WORKERS)),
+            thread_name_prefix='instagram'
+        )
+        self._dispatcher = threading.Thread(target=self._dispatch_loop, name='instagram-scheduler', daemon=True)
+        self._dispatcher.start()
+
+    def submit(self, fn, egress='default', max_attempts=3, on_retry=None, respect_cooldown=True):
+        """Schedule fn(attempt) and return a Future for its result
+
+        fn is retried up to max_attempts times unless it fails permanently
+        (see errors.classify). on_retry(attempt, delay, rate_limited, error)
+        is called whenever a failed attempt is parked for a retry. Jobs with respect_cooldown=False still take a token but
+        do not wait out a rate-limit cooldown (used by hedged downloads,
+        which exist to react to one).
+        """
+        job = _Job(fn, egress, max_attempts, on_retry, respect_cooldown)
+        self._park(job, time.monotonic())
+        return job.future
+
+    def admit(self, egress='default', respect_cooldown=True):
+        """Return a Future that resolves once a request may be made
+
+        For callers that make the request on their own thread, so it never
+        waits for a free worker behind stalled downloads. They report the
+        outcome with report_rate_limit() / report_success().
+        """
+        return self.submit(None, egress=egress, max_attempts=1, respect_cooldown=respect_cooldown)
+
+    def report_rate_limit(self):
+        """Slow every job in the process down after a rate-limit signal"""
+        metrics.RATE_LIMIT_HITS.inc()
+        self.limits.strike(self.cooldown)
+        with self._cond:
+            self._cond.notify_all()
+
+    def report_success(self):
+        """A successful request resets the cooldown escalation"""
+        self.limits.reset_strikes()
+
+    def cooldown_remaining(self):
+        """Seconds left in the process-wide cooldown"""
+        return max(0.0, self.limits.cooldown_until() - time.monotonic())
+
+    def _park(self, job, ready_at):
+        with self._cond:
+            heap = self._parked if job.respect_cooldown else self._exempt
+            heapq.heappush(heap, (ready_at, next(self._seq), job))
+            self._cond.notify_all()
+
+    def _dispatch_loop(self):
+        while True:
+            with self._cond:
+                while True:
+                    now = time.monotonic()
+                    for heap in (self._parked, self._exempt):
+                        while heap and heap[0][2].future.cancelled():
+                            heapq.heappop(heap)
+                    if not self._parked and not self._exempt:
+                        self._cond.wait()
+                        continue
+
+                    # The head of each heap, and how long until it may run
+                    candidates = []
+                    if self._parked:
+                        candidates.append((max(self._parked[0][0], self.limits.cooldown_until()) - now, self._parked))
+                    if self._exempt:
+                        candidates.append((self._exempt[0][0] - now, self._exempt))
+                    wait, heap = min(candidates, key=lambda c: c[0])
+
+                    job = heap[0][2]
+                    if wait <= 0:
+                        wait = self.limits.try_take(job.egress, now)
+                        if wait <= 0:
+                            heapq.heappop(heap)
+                            break
+                    self._cond.wait(timeout=wait)
+
+            if job.fn is None:
+                _settle(job.future.set_result, None)  # Admission only, see admit()
+            else:
+                self._pool.submit(self._run, job)
+
+    def _run(self, job):
+        # The future stays pending across attempts so parked retries can
+        # still be cancelled by the caller
+        if job.future.cancelled():
+            return
+
+        attempt = job.attempt
+        try:
+            result = job.fn(attempt)
+        except Exception as e:
+            kind = errors.classify(e)
+            rate_limited = kind == errors.RATE_LIMITED
+            if rate_limited:
+                self.report_rate_limit()
+
+            job.attempt += 1
+            if kind == errors.PERMANENT or job.attempt >= job.max_attempts:
+                _settle(job.future.set_exception, e)
+                return
+
+            delay = _jitter(self.base_delay * (2 ** attempt if rate_limited else 1))
+            if job.on_retry:
+                try:
+                    job.on_retry(attempt, delay, rate_limited, e)
+                except Exception:
+                    pass
+
+            # Park the retry - it will not run before the cooldown either way
+            metrics.RETRIES.inc()
+            self._park(job, time.monotonic() + delay)
+            return
+
+        self.report_success()
+        _settle(job.future.set_result, result)
+
+
+def _settle(setter, value):
+    """Resolve a future unless the caller cancelled it meanwhile"""
+    try:
+        setter(value)
+    except InvalidStateError:
+        pass
+
+
+def _jitter(delay):
+    """Randomize a delay to between half and all of it"""
+    return delay * random.uniform(0.5, 1.0)
+
+
+_scheduler = None
+_shared_limits = None
+_scheduler_lock = threading.Lock()
+
+
+def get_scheduler():
+    """Return the process-wide scheduler, creating it on first use"""
+    global _scheduler
+    with _scheduler_lock:
+        if _scheduler is None:
+            _scheduler = InstagramScheduler(limits=_shared_limits)
+        return _scheduler
+
+
+def share_limits(limits):
+    """Make this process's scheduler use SharedLimits from the worker pool"""
+    global _shared_limits
+    with _scheduler_lock:
+        _shared_limits = limits
+        if _scheduler is not None:
+            _scheduler.limits = limits
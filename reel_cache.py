@@ -0,0 +1,202 @@
+import os
+import json
+import time
+import hashlib
+import tempfile
+
+# Default cache settings - can be overridden with environment variables
+DEFAULT_CACHE_DIR = os.path.join(os.path.expanduser('~'), '.cache', 'reel_transcripts')
+DEFAULT_TTL = 7 * 24 * 3600  # 7 days
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024  # 256MB
+DEFAULT_INFO_TTL = 3600  # Instagram media URLs are signed and expire
+DEFAULT_INFO_MAX_BYTES = 64 * 1024 * 1024  # 64MB
+DEFAULT_NEGATIVE_TTL = 6 * 3600  # Deleted reels stay deleted; private ones may open up
+DEFAULT_NEGATIVE_MAX_BYTES = 8 * 1024 * 1024  # 8MB
+
+
+def cache_root():
+    """Root directory shared by all on-disk caches"""
+    return os.getenv('REEL_CACHE_DIR', DEFAULT_CACHE_DIR)
+
+
+def ytdlp_cache_dir():
+    """Directory handed to yt-dlp as its 'cachedir'"""
+    return os.getenv('REEL_YTDLP_CACHE_DIR', os.path.join(cache_root(), 'yt-dlp'))
+
+
+class DiskCache:
+    """JSON-on-disk cache with TTL expiry and size-bounded LRU eviction
+
+    Every entry is its own file so several processes can share one cache
+    directory. Writes are atomic (write + rename) and a file's mtime is
+    bumped on every hit, so eviction removes the least recently used first.
+    """
+
+    def __init__(self, cache_dir, ttl=DEFAULT_TTL, max_bytes=DEFAULT_MAX_BYTES):
+        self.cache_dir = cache_dir
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+    def _path(self, key):
+        """Map a cache key to its file path"""
+        digest = hashlib.sha256(key.encode('utf-8')).hexdigest()
+        return os.path.join(self.cache_dir, f"{digest}.json")
+
+    def get(self, key):
+        """Return the cached value for key, or None on miss/expiry"""
+        path = self._path(key)
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            return None
+
+        if self.ttl and time.time() - entry.get('stored_at', 0) > self.ttl:
+            self.delete(key)
+            return None
+
+        # Touch the file so LRU eviction sees it as recently used
+        try:
+            os.utime(path, None)
+        except OSError:
+            pass
+
+        return entry.get('value')
+
+    def set(self, key, value):
+        """Store a JSON-serializable value under key"""
+        entry = {'key': key, 'stored_at': time.time(), 'value': value}
+        fd, tmp_path = tempfile.mkstemp(dir=self.cache_dir, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                json.dump(entry, f)
+            os.replace(tmp_path, self._path(key))
+        except Exception:
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass
+            raise
+
+        self._evict()
+
+    def delete(self, key):
+        """Remove key from the cache if present"""
+        try:
+            os.remove(self._path(key))
+        except OSError:
+            pass
+
+    def clear(self):
+        """Remove every entry from the cache"""
+        for path, _, _ in self._entries():
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+    def _entries(self):
+        """List (path, size, mtime) for every cache entry"""
+        entries = []
+        try:
+            with os.scandir(self.cache_dir) as it:
+                for entry in it:
+                    if not entry.name.endswith('.json'):
+                        continue
+                    try:
+                        stat = entry.stat()
+                    except OSError:
+                        continue
+                    entries.append((entry.path, stat.st_size, stat.st_mtime))
+        except OSError:
+            pass
+        return entries
+
+    def _evict(self):
+        """Drop least recently used entries until the cache fits max_bytes"""
+        if not self.max_bytes:
+            return
+
+        entries = self._entries()
+        total = sum(size for _, size, _ in entries)
+        if total <= self.max_bytes:
+            return
+
+        for path, size, _ in sorted(entries, key=lambda e: e[2]):
+            try:
+                os.remove(path)
+            except OSError:
+                continue
+            total -= size
+            if total <= self.max_bytes:
+                break
+
+
+class TranscriptCache(DiskCache):
+    """Cache of formatted extract_reel_data results keyed by shortcode and model"""
+
+    def __init__(self, cache_dir=None, ttl=None, max_bytes=None):
+        super().__init__(
+            cache_dir or cache_root(),
+            ttl=ttl if ttl is not None else int(os.getenv('REEL_CACHE_TTL', DEFAULT_TTL)),
+            max_bytes=max_bytes if max_bytes is not None else int(os.getenv('REEL_CACHE_MAX_BYTES', DEFAULT_MAX_BYTES)),
+        )
+
+    def get_result(self, shortcode, model):
+        """Return the cached result dict for a reel, or None"""
+        return self.get(f"transcript:{shortcode}:{model}")
+
+    def set_result(self, shortcode, model, result):
+        """Cache the result dict for a reel"""
+        self.set(f"transcript:{shortcode}:{model}", result)
+
+
+class InfoCache(DiskCache):
+    """Cache of yt-dlp info dicts keyed by shortcode
+
+    Lets retries, the alternative download strategy and metadata reads reuse
+    one resolution of a reel instead of asking Instagram again.
+    """
+
+    def __init__(self, cache_dir=None, ttl=None, max_bytes=None):
+        super().__init__(
+            cache_dir or os.path.join(cache_root(), 'info'),
+            ttl=ttl if ttl is not None else int(os.getenv('REEL_INFO_CACHE_TTL', DEFAULT_INFO_TTL)),
+            max_bytes=max_bytes if max_bytes is not None else DEFAULT_INFO_MAX_BYTES,
+        )
+
+    def get_info(self, shortcode):
+        """Return the cached info dict for a reel, or None"""
+        return self.get(f"info:{shortcode}")
+
+    def set_info(self, shortcode, info):
+        """Cache the (sanitized) info dict for a reel"""
+        self.set(f"info:{shortcode}", info)
+
+    def delete_info(self, shortcode):
+        """Forget the cached info dict for a reel"""
+        self.delete(f"info:{shortcode}")
+
+
+class NegativeCache(DiskCache):
+    """Cache of permanent failures keyed by shortcode
+
+    Repeated requests for deleted or private reels are answered from here
+    without touching the network until the entry expires.
+    """
+
+    def __init__(self, cache_dir=None, ttl=None, max_bytes=None):
+        super().__init__(
+            cache_dir or os.path.join(cache_root(), 'negative'),
+            ttl=ttl if ttl is not None else int(os.getenv('REEL_NEGATIVE_CACHE_TTL', DEFAULT_NEGATIVE_TTL)),
+            max_bytes=max_bytes if max_bytes is not None else DEFAULT_NEGATIVE_MAX_BYTES,
+        )
+
+    def get_failure(self, shortcode):
+        """Return the recorded failure for a reel, or None"""
+        return self.get(f"negative:{shortcode}")
+
+    def set_failure(self, shortcode, reason, error):
+        """Record that a reel failed permanently"""
+        self.set(f"negative:{shortcode}", {"reason": reason, "error": str(error)[:500]})
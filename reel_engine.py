@@ -0,0 +1,1366 @@
+#!/usr/bin/env python3
+"""
+Headless extraction engine for the Instagram Reel Transcript Extractor
+
+The engine runs the download -> audio extraction -> transcription pipeline
+without any UI dependency. Front-ends (Streamlit, Flask, CLI) observe it
+through two callbacks:
+
+    on_progress(stage, percent, message)   - stage transitions
+    on_message(level, message)             - 'info' / 'warning' / 'error'
+"""
+
+import os
+import re
+import time
+import shutil
+import tempfile
+import threading
+import subprocess
+import queue
+from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+from reel_cache import TranscriptCache, InfoCache, NegativeCache, ytdlp_cache_dir
+from workspace import JobWorkspace, QuotaExceeded
+from rate_limiter import get_scheduler
+from single_flight import get_single_flight
+from openai_client import get_shared_client
+import audio_codecs
+import errors
+from deadline import Deadline, DeadlineExceeded
+import metrics
+import profiling
+from transcription_backends import BACKENDS, BackendUnavailable, OpenAIBackend, backend_name, get_backend
+from fragment_concurrency import get_fragment_controller
+
+# yt_dlp and audio_chunking (numpy) are imported where they are used, so
+# importing the engine stays cheap for front-ends and cold starts
+from worker_pool import get_worker_pool, TASK_DOWNLOAD, TASK_EXTRACT_AUDIO
+
+# Pipeline stages reported through on_progress
+STAGE_DOWNLOADING = "downloading"
+STAGE_DOWNLOADED = "downloaded"
+STAGE_EXTRACTING_AUDIO = "extracting_audio"
+STAGE_AUDIO_EXTRACTED = "audio_extracted"
+STAGE_TRANSCRIBING = "transcribing"
+STAGE_TRANSCRIBED = "transcribed"
+STAGE_FORMATTING = "formatting"
+STAGE_COMPLETE = "complete"
+
+# Audio-first format ladder: the audio-only DASH stream when Instagram exposes
+# one, otherwise the smallest muxed stream that still carries audio
+AUDIO_FIRST_FORMAT = 'bestaudio[vcodec=none]/worst[acodec!=none]/worst'
+
+# Format the downloader used before the audio-first ladder, kept as the
+# baseline for reporting bytes saved
+LEGACY_VIDEO_FORMAT_MAX_HEIGHT = 720
+
+# Streamed audio stays in memory up to this size, then spills to the workspace
+DEFAULT_AUDIO_SPILL_BYTES = 16 * 1024 * 1024
+
+# Long audio is transcribed in chunks of about this many seconds
+DEFAULT_CHUNK_SECONDS = 180
+DEFAULT_TRANSCRIBE_CONCURRENCY = 4
+MAX_UPLOAD_BYTES = 24 * 1024 * 1024  # Whisper API rejects files over 25MB
+
+# Seconds the primary download runs alone before the alternative races it
+# (a rate-limit error starts the race at once; negative waits for a failure)
+DEFAULT_HEDGE_DELAY = 10
+
+# yt-dlp options that change per job; a reused downloader gets them patched in
+PER_JOB_YDL_OPTIONS = ('outtmpl', 'max_filesize', 'progress_hooks', 'concurrent_fragment_downloads',
+                       'skip_unavailable_fragments', 'socket_timeout')
+
+DOWNLOAD_FAILED_ERROR = """❌ **Unable to download Instagram video**
+
+**Instagram is blocking automated access:**
+Instagram has very strict anti-bot protection that blocks most automated download attempts. This is a platform limitation, not a bug in this app.
+
+**What happened:**
+- The app tried 3 different methods with multiple retries
+- Instagram detected automated access and blocked the request
+- This is common with Instagram's current security measures
+
+**What you can try:**
+1. ⏳ **Wait 30-60 minutes** - Rate limits usually reset after some time
+2. ✅ **Verify the account is public** - Private accounts won't work
+3. 🔄 **Try a different reel** - Some reels may be more accessible
+4. 📱 **Try from a different network/IP** - If possible
+5. 🌐 **Try again tomorrow** - Instagram's blocking is often temporary
+
+**Why this happens:**
+Instagram actively prevents automated tools from downloading content to protect user privacy and prevent scraping. Even legitimate tools like this one are affected.
+
+**Alternative solutions:**
+- Download the video manually from Instagram
+- Use Instagram's built-in captions if available
+- Screen record the video and extract audio
+- Wait and try again later when rate limits reset
+
+**Note:** This app works when Instagram allows access, but Instagram's blocking is unpredictable and varies by account, content, and time."""
+
+
+class ReelEngineError(Exception):
+    """Raised when the engine cannot be set up (e.g. missing API key)"""
+
+
+class ReelTranscriptEngine:
+    def __init__(self, api_key=None, on_progress=None, on_message=None, cache=None, info_cache=None,
+                 reuse_downloaders=False, backend=None, negative_cache=None):
+        self.api_key = api_key
+        # Transcription backend; None selects one from REEL_TRANSCRIPTION_BACKEND
+        self.backend = backend
+        self.on_progress = on_progress
+        self.on_message = on_message
+        # Keep YoutubeDL instances (and their connections) between jobs, as in
+        # a pool worker; each is checked out by one download at a time
+        self.reuse_downloaders = reuse_downloaders
+        self._downloaders = {}  # Options key -> idle YoutubeDL instances
+        self._downloaders_lock = threading.Lock()
+        # Messages from helper threads are queued here and relayed by the caller
+        self._relay = threading.local()
+        self.hedge_delay = float(os.getenv('REEL_HEDGE_DELAY', DEFAULT_HEDGE_DELAY))
+        self.chunk_seconds = int(os.getenv('REEL_CHUNK_SECONDS', DEFAULT_CHUNK_SECONDS))
+        self.transcribe_concurrency = int(os.getenv('REEL_TRANSCRIBE_CONCURRENCY', DEFAULT_TRANSCRIBE_CONCURRENCY))
+        self.max_upload_bytes = int(os.getenv('REEL_MAX_UPLOAD_BYTES', MAX_UPLOAD_BYTES))
+        # Codec profile for extracted audio, and whether to pick its bitrate
+        # so a whole reel fits one upload
+        try:
+            self.audio_profile = audio_codecs.get_profile()
+        except ValueError as e:
+            raise ReelEngineError(str(e)) from e
+        self.size_target = os.getenv('REEL_AUDIO_SIZE_TARGET', '0').lower() in ('1', 'true', 'yes')
+        # Voice-activity trimming: only speech is uploaded and billed
+        self.vad = os.getenv('REEL_VAD', '0').lower() in ('1', 'true', 'yes')
+        # Identity of the network path to Instagram, one token bucket each
+        self.egress = os.getenv('REEL_EGRESS', 'default')
+        # Fetch media from somewhere else, e.g. a local fixture server for
+        # benchmarks: "http://127.0.0.1:8000/media/{shortcode}.mp4"
+        self.source_url_template = os.getenv('REEL_SOURCE_URL_TEMPLATE')
+
+        # Persistent transcript cache - extraction still works without it
+        if cache is None:
+            try:
+                cache = TranscriptCache()
+            except OSError:
+                cache = None
+        self.cache = cache
+
+        # Resolved yt-dlp info dicts, shared by retries and both download strategies
+        if info_cache is None:
+            try:
+                info_cache = InfoCache()
+            except OSError:
+                info_cache = None
+        self.info_cache = info_cache
+
+        # Reels that failed permanently (deleted, private) are not fetched again until this expires
+        if negative_cache is None:
+            try:
+                negative_cache = NegativeCache()
+            except OSError:
+                negative_cache = None
+        self.negative_cache = negative_cache
+
+    def _progress(self, stage, percent, message):
+        """Report a stage transition to the front-end"""
+        if self.on_progress:
+            self.on_progress(stage, percent, message)
+
+    def _message(self, level, message):
+        """Report an info/warning/error message to the front-end"""
+        relay = getattr(self._relay, 'queue', None)
+        if relay is not None:
+            relay.put((level, message))
+        elif self.on_message:
+            self.on_message(level, message)
+
+    def normalize_instagram_url(self, url):
+        """Normalize Instagram URL to handle all formats"""
+        if not url:
+            return None
+
+        # Remove whitespace
+        url = url.strip()
+
+        # Handle different Instagram URL formats
+        # Support: reel/, p/, tv/, with/without www, with/without https
+        instagram_patterns = [
+            r'https?://(www\.)?instagram\.com/(reel|p|tv)/([A-Za-z0-9_-]+)',
+            r'instagram\.com/(reel|p|tv)/([A-Za-z0-9_-]+)',
+            r'(reel|p|tv)/([A-Za-z0-9_-]+)',
+        ]
+
+        # Extract the post ID from any format
+        for pattern in instagram_patterns:
+            match = re.search(pattern, url)
+            if match:
+                # Type and ID are always the last two groups
+                post_type, post_id = match.groups()[-2:]
+
+                # Normalize to standard format
+                normalized = f"https://www.instagram.com/{post_type}/{post_id}/"
+                return normalized
+
+        # If no pattern matches, try to clean the URL
+        if 'instagram.com' in url:
+            # Remove query parameters and fragments
+            url = url.split('?')[0].split('#')[0]
+            # Ensure it ends with /
+            if not url.endswith('/'):
+                url += '/'
+            # Ensure https://
+            if not url.startswith('http'):
+                url = 'https://' + url
+            return url
+
+        return None
+
+    def validate_instagram_url(self, url):
+        """Validate if URL is a valid Instagram URL"""
+        if not url:
+            return False, "URL is empty"
+
+        normalized = self.normalize_instagram_url(url)
+        if not normalized:
+            return False, "Invalid Instagram URL format"
+
+        # Check if it's a supported type (reel, p, tv)
+        if '/reel/' in normalized or '/p/' in normalized or '/tv/' in normalized:
+            return True, normalized
+
+        return False, "URL must be an Instagram reel, post, or TV video"
+
+    def get_shortcode(self, url):
+        """Get the canonical shortcode (post ID) of an Instagram URL"""
+        normalized = self.normalize_instagram_url(url)
+        if not normalized:
+            return None
+
+        match = re.search(r'/(reel|p|tv)/([A-Za-z0-9_-]+)', normalized)
+        return match.group(2) if match else None
+
+    def _get_api_key(self):
+        """Resolve the OpenAI API key - front-ends may override this"""
+        return self.api_key or os.getenv('OPENAI_API_KEY')
+
+    def _init_openai_client(self):
+        """Initialize OpenAI client - separated to avoid issues with __init__"""
+        self.openai_key = self._get_api_key()
+
+        if not self.openai_key:
+            raise ReelEngineError("OpenAI API Key not found")
+
+        # Validate API key format
+        if not isinstance(self.openai_key, str) or not self.openai_key.strip():
+            raise ReelEngineError("Invalid API Key format")
+
+        try:
+            # One pooled, keep-alive client per process - no handshake per job
+            self.client = get_shared_client(self.openai_key.strip())
+        except Exception as e:
+            raise ReelEngineError(f"Error initializing OpenAI client: {str(e)}") from e
+
+    def download_instagram_video(self, url, workspace=None, cancel=None, on_failure=None, deadline=None):
+        """Download Instagram video using yt-dlp with improved error handling
+
+        The file is written into the job's workspace. Without one a fresh
+        workspace is opened; the caller then owns its cleanup (orphans are
+        removed by the workspace janitor).
+
+        Setting the `cancel` event abandons the download. on_failure(kind)
+        is called with the errors.classify() kind of every failed attempt.
+        Permanent failures are not retried and are recorded in the negative
+        cache. Socket timeouts and waits are capped by `deadline`.
+        """
+        # Normalize URL first
+        is_valid, normalized_url = self.validate_instagram_url(url)
+        if not is_valid:
+            return None, None
+
+        workspace = workspace or JobWorkspace().open()
+        deadline = deadline or Deadline()
+
+        url = normalized_url
+        max_retries = 3  # Reduced retries to avoid long waits
+        retry_messages = queue.Queue()
+
+        def attempt_download(attempt):
+            if cancel is not None and cancel.is_set():
+                raise Exception("Download cancelled")
+
+            # Configure yt-dlp options with better error handling
+            # Updated for Instagram's stricter access requirements
+            # Rotate user agents to avoid detection
+            user_agents = [
+                'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
+                'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
+                'Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
+            ]
+
+            ydl_opts = {
+                'format': AUDIO_FIRST_FORMAT,  # Only the audio is used, skip the video stream when possible
+                'outtmpl': workspace.file('media.%(ext)s'),
+                'max_filesize': workspace.quota_bytes or None,  # Enforce the per-job disk quota
+                'quiet': True,  # Quiet mode to avoid issues
+                'no_warnings': True,
+                'noprogress': True,  # quiet alone still prints the progress bar
+                'extract_flat': False,
+                'socket_timeout': deadline.timeout(120, 'download'),  # Increased timeout for Instagram
+                'retries': 3,  # Retries per attempt
+                'fragment_retries': 3,  # Fragment retries
+                'http_chunk_size': 10485760,  # 10MB chunks
+                'concurrent_fragment_downloads': 1,  # Serial unless REEL_FRAGMENT_MODE=adaptive
+                'ignoreerrors': False,
+                'no_check_certificate': False,  # Use proper certificates
+                'prefer_insecure': False,
+                # Rotate user agent based on attempt
+                'user_agent': user_agents[attempt % len(user_agents)],
+                # Add referer to look more legitimate
+                'referer': 'https://www.instagram.com/',
+                # Additional headers to bypass some restrictions
+                'headers': {
+                    'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/avif,image/webp,image/apng,*/*;q=0.8',
+                    'Accept-Language': 'en-US,en;q=0.9',
+                    'Accept-Encoding': 'gzip, deflate, br',
+                    'DNT': '1',
+                    'Connection': 'keep-alive',
+                    'Upgrade-Insecure-Requests': '1',
+                    'Sec-Fetch-Dest': 'document',
+                    'Sec-Fetch-Mode': 'navigate',
+                    'Sec-Fetch-Site': 'none',
+                    'Cache-Control': 'max-age=0',
+                },
+            }
+
+            # Fragmented media: let the adaptive controller pick the fan-out
+            fragments = get_fragment_controller()
+            run = fragments.track() if fragments else None
+            if run:
+                ydl_opts['concurrent_fragment_downloads'] = run.concurrency
+                ydl_opts['progress_hooks'] = [run.hook]
+                # Fail on a lost fragment so the controller sees it; the retry goes serial
+                ydl_opts['skip_unavailable_fragments'] = run.concurrency == 1
+            if cancel is not None:
+                ydl_opts['progress_hooks'] = ydl_opts.get('progress_hooks', []) + [self._cancel_hook(cancel)]
+
+            try:
+                video_path, info = self._fetch_media(ydl_opts, url)
+            except Exception as e:
+                if run:
+                    run.finish(False, e)
+                raise
+            if run:
+                run.finish(bool(video_path))
+            if video_path:
+                return video_path, info
+
+            raise Exception("No video file found after download")
+
+        def on_retry(attempt, delay, rate_limited, error):
+            # Called on a scheduler thread - hand the messages to the caller's thread
+            if on_failure:
+                on_failure(errors.classify(error))
+            if rate_limited:
+                retry_messages.put(('warning', f"⚠️ Attempt {attempt + 1}/{max_retries}: Instagram rate limit detected"))
+            else:
+                retry_messages.put(('warning', f"Attempt {attempt + 1}/{max_retries} failed: {str(error)[:100]}..."))
+            retry_messages.put(('info', f"⏳ Waiting {delay:.0f} seconds before retry..."))
+
+        # Retries are parked in the shared scheduler instead of sleeping here,
+        # and a rate limit seen by any job slows every job down
+        future = get_scheduler().submit(profiling.carry(attempt_download), egress=self.egress,
+                                        max_attempts=max_retries, on_retry=on_retry)
+        try:
+            while True:
+                try:
+                    return future.result(timeout=0.5)
+                except FutureTimeoutError:
+                    if cancel is not None and cancel.is_set():
+                        future.cancel()  # Drops any parked retry
+                        return None, None
+                    if deadline.expired():
+                        future.cancel()
+                        self._message('error', "⏱️ Out of time while downloading")
+                        return None, None
+                finally:
+                    while not retry_messages.empty():
+                        self._message(*retry_messages.get())
+        except Exception as e:
+            if cancel is not None and cancel.is_set():
+                return None, None
+            if isinstance(e, DeadlineExceeded):
+                self._message('error', "⏱️ Out of time while downloading")
+                return None, None
+            kind = errors.classify(e)
+            if on_failure:
+                on_failure(kind)
+            if kind == errors.PERMANENT:
+                self._remember_failure(url, e)
+                self._message('error', f"❌ {errors.permanent_reason(e) or 'The reel cannot be downloaded'} - not retrying")
+                return None, None
+
+            error_msg = str(e)
+            if kind == errors.RATE_LIMITED:
+                self._message('error', f"❌ All {max_retries} attempts failed due to Instagram rate limiting")
+            else:
+                self._message('error', f"❌ All {max_retries} attempts failed. Last error: {error_msg[:200]}")
+            return None, None
+
+    def download_instagram_video_alternative(self, url, workspace=None, cancel=None, hedged=False, deadline=None):
+        """Alternative download method using different yt-dlp configuration
+
+        A hedged run skips the process-wide rate-limit cooldown - it was
+        started because the primary is being blocked. The download runs on
+        the calling thread once the scheduler admits it, so it never queues
+        behind stalled downloads in the scheduler's pool.
+        """
+        try:
+            workspace = workspace or JobWorkspace().open()
+            deadline = deadline or Deadline()
+
+            # Alternative configuration - more conservative approach
+            ydl_opts = {
+                'format': AUDIO_FIRST_FORMAT,  # Audio-only or smallest stream to avoid issues
+                'outtmpl': workspace.file('media_alt.%(ext)s'),
+                'max_filesize': workspace.quota_bytes or None,
+                'quiet': True,
+                'no_warnings': True,
+                'noprogress': True,
+                'extract_flat': False,
+                'socket_timeout': deadline.timeout(60, 'download'),  # Longer timeout
+                'retries': 5,
+                'fragment_retries': 5,
+                'http_chunk_size': 5242880,  # Smaller chunks (5MB)
+                'concurrent_fragment_downloads': 1,
+                'ignoreerrors': True,  # Ignore errors and continue
+                'no_check_certificate': True,
+                'prefer_insecure': True,  # Try HTTP first
+                'user_agent': 'Instagram 219.0.0.12.117 Android',
+                'referer': 'https://www.instagram.com/',
+                'headers': {
+                    'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8',
+                    'Accept-Language': 'en-us,en;q=0.5',
+                    'Accept-Encoding': 'gzip, deflate',
+                    'Accept-Charset': 'ISO-8859-1,utf-8;q=0.7,*;q=0.7',
+                    'Connection': 'keep-alive',
+                }
+            }
+
+            if cancel is not None:
+                ydl_opts['progress_hooks'] = [self._cancel_hook(cancel)]
+
+            scheduler = get_scheduler()
+            admitted = scheduler.admit(egress=self.egress, respect_cooldown=not hedged)
+            while True:
+                try:
+                    admitted.result(timeout=0.5)
+                    break
+                except FutureTimeoutError:
+                    if (cancel is not None and cancel.is_set()) or deadline.expired():
+                        admitted.cancel()
+                        return None, None
+
+            # Reuses the info resolved by the primary method when available
+            try:
+                video_path, info = self._fetch_media(ydl_opts, url)
+            except Exception as e:
+                if errors.classify(e) == errors.RATE_LIMITED:
+                    scheduler.report_rate_limit()
+                raise
+            scheduler.report_success()
+            if not video_path:
+                return None, None
+            return video_path, info
+
+        except Exception as e:
+            if cancel is None or not cancel.is_set():
+                self._message('warning', f"Alternative download method failed: {str(e)}")
+            return None, None
+
+    def download_hedged(self, url, workspace, deadline=None, on_failure=None):
+        """Race the primary and alternative download strategies
+
+        The primary starts alone; the alternative joins after hedge_delay
+        seconds, on the primary's first rate-limit error, or when the
+        primary fails (unless permanently). The first file wins and the
+        other strategy is cancelled. Each strategy downloads into its own
+        sub-workspace, and the loser's is removed. Both stop when the
+        deadline runs out. on_failure(kind) sees the primary's failures.
+
+        Each strategy's time is recorded as stage download_primary or
+        download_alternative (unless it was cancelled), and the winner in
+        DOWNLOAD_WINS.
+        """
+        deadline = deadline or Deadline()
+        primary = {"name": "primary", "cancel": threading.Event()}
+        alternative = {"name": "alternative", "cancel": threading.Event()}
+        hedge_now = threading.Event()
+        permanent = threading.Event()
+
+        def on_primary_failure(kind):
+            # Called from scheduler threads
+            if kind == errors.RATE_LIMITED:
+                hedge_now.set()
+            elif kind == errors.PERMANENT:
+                permanent.set()
+            if on_failure:
+                on_failure(kind)
+        messages = queue.Queue()
+        finished = queue.Queue()
+
+        def run(strategy, download, **kwargs):
+            self._relay.queue = messages
+            started_at = time.perf_counter()
+            try:
+                outcome = download(url, strategy["workspace"], cancel=strategy["cancel"], deadline=deadline, **kwargs)
+            except Exception as e:
+                self._message('warning', f"{strategy['name'].capitalize()} download failed: {str(e)[:200]}")
+                outcome = (None, None)
+            finally:
+                self._relay.queue = None
+                if strategy["cancel"].is_set():
+                    strategy["workspace"].cleanup()  # Whatever the loser wrote after losing
+            if not strategy["cancel"].is_set():
+                # A cancelled loser's time says nothing about its strategy
+                stage = f"download_{strategy['name']}"
+                metrics.STAGE_SECONDS.labels(stage).observe(time.perf_counter() - started_at)
+                if not outcome[0]:
+                    metrics.STAGE_FAILURES.labels(stage).inc()
+            finished.put((strategy, outcome))
+
+        def start(strategy, download, **kwargs):
+            root = workspace.open().path
+            strategy["workspace"] = JobWorkspace(root=root, quota_bytes=workspace.quota_bytes).open()
+            racers.submit(profiling.carry(run), strategy, download, **kwargs)
+
+        racers = ThreadPoolExecutor(max_workers=2, thread_name_prefix='download-race')
+        start(primary, self.download_instagram_video, on_failure=on_primary_failure)
+        started = time.monotonic()
+        running = [primary]
+        winner = None
+        try:
+            while winner is None and (running or ("workspace" not in alternative and not permanent.is_set())):
+                if deadline.expired():
+                    break  # Both strategies are cancelled below
+                if "workspace" not in alternative and not permanent.is_set() and (
+                    hedge_now.is_set() or 0 <= self.hedge_delay <= time.monotonic() - started
+                ):
+                    if running:
+                        self._message('info', "⏩ Racing the alternative download method...")
+                    else:
+                        self._message('warning', "Primary download failed, trying alternative method...")
+                    start(alternative, self.download_instagram_video_alternative, hedged=True)
+                    running.append(alternative)
+
+                try:
+                    strategy, (video_path, info) = finished.get(timeout=0.25)
+                except queue.Empty:
+                    continue
+                finally:
+                    while not messages.empty():
+                        self._message(*messages.get())
+
+                running.remove(strategy)
+                if video_path:
+                    winner = (strategy, video_path, info)
+                elif permanent.is_set():
+                    break  # The other strategy would get the same answer
+                else:
+                    hedge_now.set()  # A failed primary starts the alternative right away
+        finally:
+            for strategy in (primary, alternative):
+                if winner is None or strategy is not winner[0]:
+                    strategy["cancel"].set()
+                    if "workspace" in strategy:
+                        strategy["workspace"].cleanup()
+            racers.shutdown(wait=False)
+            while not messages.empty():
+                self._message(*messages.get())
+
+        if winner is None:
+            return None, None
+        strategy, video_path, info = winner
+        metrics.DOWNLOAD_WINS.labels(strategy["name"]).inc()
+        if strategy is alternative:
+            self._message('info', "✅ Alternative download method won the race")
+        return video_path, info
+
+    def _cancel_hook(self, cancel):
+        """yt-dlp progress hook that aborts the download once `cancel` is set"""
+        from yt_dlp.utils import DownloadCancelled
+
+        def hook(status):
+            if cancel.is_set():
+                raise DownloadCancelled("Superseded by the other download strategy")
+        return hook
+
+    def _fetch_media(self, ydl_opts, url):
+        """Resolve and download a reel with a single Instagram round trip
+
+        The reel is resolved once (extract_info with process=False), the info
+        dict is persisted per shortcode, and format selection + download run
+        on that dict. Retries and the alternative strategy start from the
+        cached info instead of resolving the reel again.
+        """
+        shortcode = self.get_shortcode(url)
+        info_cache = self.info_cache if shortcode else None
+        ydl_opts.setdefault('cachedir', ytdlp_cache_dir())
+
+        info = info_cache.get_info(shortcode) if info_cache else None
+        from_cache = info is not None
+        if info_cache:
+            metrics.cache_lookup('info', from_cache)
+
+        with self._downloader(ydl_opts) as ydl:
+            if info is None:
+                info = ydl.extract_info(self._source_url(url, shortcode), download=False, process=False)
+                if not info:
+                    raise Exception("Could not extract video information")
+                if info_cache:
+                    try:
+                        info_cache.set_info(shortcode, ydl.sanitize_info(info))
+                    except Exception:
+                        pass  # Caching is best-effort
+
+            try:
+                info = ydl.process_ie_result(info, download=True)
+            except Exception:
+                if from_cache:
+                    # Signed media URLs may have expired - resolve again next time
+                    info_cache.delete_info(shortcode)
+                raise
+
+        # yt-dlp reports exactly where it wrote the file
+        for download in (info or {}).get('requested_downloads') or []:
+            path = download.get('filepath')
+            if path and os.path.exists(path) and os.path.getsize(path) > 0:
+                return path, info
+
+        # yt-dlp skips a file over max_filesize without raising; any other
+        # failure to write it raises above (ignoreerrors is off)
+        limit = ydl_opts.get('max_filesize')
+        if limit and info:
+            formats = info.get('requested_formats') or [info]
+            sizes = [f.get('filesize') or f.get('filesize_approx') for f in formats]
+            if None in sizes or sum(sizes) > limit:
+                raise QuotaExceeded(f"Media file is larger than max-filesize (the job's {limit / 1048576:.1f} MB quota)")
+
+        return None, info
+
+    def _source_url(self, url, shortcode):
+        """URL yt-dlp resolves - the reel itself unless REEL_SOURCE_URL_TEMPLATE redirects it"""
+        if self.source_url_template and shortcode:
+            return self.source_url_template.format(shortcode=shortcode)
+        return url
+
+    @contextmanager
+    def _downloader(self, ydl_opts):
+        """YoutubeDL for these options, for the caller's exclusive use
+
+        With reuse_downloaders an idle instance is checked out and handed
+        back afterwards, so a download still running (e.g. the cancelled
+        loser of a hedged race) never shares one with the next job.
+        """
+        import yt_dlp
+
+        if not self.reuse_downloaders:
+            with yt_dlp.YoutubeDL(ydl_opts) as ydl:
+                yield ydl
+            return
+
+        key = repr(sorted((k, v) for k, v in ydl_opts.items() if k not in PER_JOB_YDL_OPTIONS))
+        with self._downloaders_lock:
+            idle = self._downloaders.get(key)
+            ydl = idle.pop() if idle else None
+        if ydl is None:
+            ydl = yt_dlp.YoutubeDL(ydl_opts)
+        else:
+            # YoutubeDL normalizes outtmpl into a dict keyed by output type
+            ydl.params['outtmpl']['default'] = ydl_opts['outtmpl']
+            ydl.params['max_filesize'] = ydl_opts.get('max_filesize')
+            ydl.params['concurrent_fragment_downloads'] = ydl_opts.get('concurrent_fragment_downloads', 1)
+            ydl.params['skip_unavailable_fragments'] = ydl_opts.get('skip_unavailable_fragments', True)
+            # Hooks are registered at construction; swap in this job's
+            ydl._progress_hooks = list(ydl_opts.get('progress_hooks') or [])
+            # So are the request handlers' timeouts - this job's follows its deadline
+            ydl.params['socket_timeout'] = ydl_opts.get('socket_timeout')
+            for handler in ydl._request_director.handlers.values():
+                handler.timeout = float(ydl_opts.get('socket_timeout') or 20)
+        try:
+            yield ydl
+        finally:
+            with self._downloaders_lock:
+                self._downloaders.setdefault(key, []).append(ydl)
+
+    def get_video_info(self, url):
+        """Return reel metadata, from the info cache when possible"""
+        shortcode = self.get_shortcode(url)
+        if self.info_cache and shortcode:
+            info = self.info_cache.get_info(shortcode)
+            if info:
+                return info
+
+        import yt_dlp
+        with yt_dlp.YoutubeDL({'quiet': True, 'no_warnings': True, 'cachedir': ytdlp_cache_dir()}) as ydl:
+            info = ydl.extract_info(self._source_url(self.normalize_instagram_url(url), shortcode), download=False, process=False)
+            if info and self.info_cache and shortcode:
+                info = ydl.sanitize_info(info)
+                try:
+                    self.info_cache.set_info(shortcode, info)
+                except Exception:
+                    pass
+            return info
+
+    def _download_stats(self, info, media_path):
+        """Compare downloaded bytes against the full video stream we used to fetch"""
+        downloaded = os.path.getsize(media_path) if media_path and os.path.exists(media_path) else 0
+        duration = (info or {}).get('duration') or 0
+
+        # Estimate what 'best[height<=720]' would have downloaded
+        baseline = None
+        muxed = [
+            f for f in (info or {}).get('formats') or []
+            if f.get('vcodec') not in (None, 'none') and f.get('acodec') not in (None, 'none')
+            and (f.get('height') or 0) <= LEGACY_VIDEO_FORMAT_MAX_HEIGHT
+        ]
+        if muxed:
+            legacy = max(muxed, key=lambda f: ((f.get('height') or 0), (f.get('tbr') or 0)))
+            baseline = legacy.get('filesize') or legacy.get('filesize_approx')
+            if not baseline and legacy.get('tbr') and duration:
+                baseline = int(legacy['tbr'] * 1000 / 8 * duration)
+
+        return {
+            "download_bytes": downloaded,
+            "download_format": (info or {}).get('format_id'),
+            "download_bytes_saved": max(0, int(baseline) - downloaded) if baseline else None,
+        }
+
+    def extract_audio(self, video_path, stream=None, bitrate=None, deadline=None):
+        """Extract audio from video file using ffmpeg
+
+        With stream=True (the default, see REEL_AUDIO_STREAMING) the encoded
+        audio is returned as a file-like buffer instead of a path. The audio
+        is encoded with the engine's codec profile, at `bitrate` if given.
+        ffmpeg is killed when it outlives its timeout or the deadline.
+        """
+        deadline = deadline or Deadline()
+        if stream is None:
+            stream = os.getenv('REEL_AUDIO_STREAMING', '1').lower() in ('1', 'true', 'yes')
+        if stream:
+            return self._extract_audio_stream(video_path, bitrate, deadline)
+
+        try:
+            # Generate audio file path
+            extension = self.audio_profile["extension"]
+            audio_path = video_path.rsplit('.', 1)[0] + '.' + extension
+            if audio_path == video_path:
+                # Audio-only downloads may already use the same extension
+                audio_path = video_path.rsplit('.', 1)[0] + '_16k.' + extension
+
+            # Use ffmpeg to extract audio
+            # Convert to mono, 16kHz sample rate to save API costs
+            cmd = [
+                'ffmpeg',
+                '-i', video_path,
+                '-vn',  # Skip any video stream
+                '-ac', '1',  # Mono channel
+                '-ar', '16000',  # 16kHz sample rate
+                *audio_codecs.ffmpeg_output_args(self.audio_profile, bitrate),
+                '-y',  # Overwrite output file
+                audio_path
+            ]
+
+            result = subprocess.run(
+                cmd,
+                capture_output=True,
+                text=True,
+                timeout=deadline.timeout(60, 'audio extraction')
+            )
+
+            if result.returncode == 0 and os.path.exists(audio_path):
+                return audio_path
+            else:
+                self._message('error', f"Audio extraction failed: {result.stderr}")
+                return None
+
+        except subprocess.TimeoutExpired:
+            self._message('error', "Audio extraction timeout")
+            return None
+        except Exception as e:
+            self._message('error', f"Error extracting audio: {str(e)}")
+            return None
+
+    def _extract_audio_stream(self, video_path, bitrate=None, deadline=None):
+        """Pipe ffmpeg's encoded audio into a buffer that spills to disk when large"""
+        deadline = deadline or Deadline()
+        spill_bytes = int(os.getenv('REEL_AUDIO_SPILL_BYTES', DEFAULT_AUDIO_SPILL_BYTES))
+        spill_dir = os.path.dirname(os.path.abspath(video_path))  # The job workspace
+        buffer = tempfile.SpooledTemporaryFile(max_size=spill_bytes, dir=spill_dir)
+        buffer.upload_name = audio_codecs.upload_name(self.audio_profile)
+
+        cmd = [
+            'ffmpeg',
+            '-loglevel', 'error',
+            '-i', video_path,
+            '-vn',  # Skip any video stream
+            '-ac', '1',  # Mono channel
+            '-ar', '16000',  # 16kHz sample rate
+            *audio_codecs.ffmpeg_output_args(self.audio_profile, bitrate),
+            'pipe:1'
+        ]
+
+        process = None
+        try:
+            # Before ffmpeg starts, so an expired budget never leaves it running
+            timeout = deadline.timeout(60, 'audio extraction')
+
+            # stderr goes to a file so a chatty ffmpeg can never block on a full pipe
+            with tempfile.TemporaryFile(dir=spill_dir) as stderr_file:
+                process = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=stderr_file)
+                timed_out = threading.Event()
+
+                def kill():
+                    timed_out.set()
+                    process.kill()
+
+                timer = threading.Timer(timeout, kill)
+                timer.start()
+                try:
+                    shutil.copyfileobj(process.stdout, buffer, 64 * 1024)
+                    process.stdout.close()
+                    returncode = process.wait()
+                finally:
+                    timer.cancel()
+
+                if timed_out.is_set():
+                    self._message('error', "Audio extraction timeout")
+                    buffer.close()
+                    return None
+
+                if returncode != 0 or buffer.tell() == 0:
+                    stderr_file.seek(0)
+                    self._message('error', f"Audio extraction failed: {stderr_file.read().decode('utf-8', 'replace')}")
+                    buffer.close()
+                    return None
+
+            buffer.seek(0)
+            return buffer
+
+        except Exception as e:
+            buffer.close()
+            self._message('error', f"Error extracting audio: {str(e)}")
+            return None
+
+        finally:
+            if process is not None and process.poll() is None:
+                process.kill()  # Failed mid-copy (e.g. the workspace filled up)
+            if process is not None:
+                process.stdout.close()
+                process.wait()
+
+    def _get_backend(self):
+        """Return the transcription backend, creating it on first use
+
+        Raises ReelEngineError when it cannot be set up (no API key,
+        missing dependency, unknown backend).
+        """
+        if self.backend is None:
+            name = backend_name()
+            if name == 'openai':
+                if not hasattr(self, 'client'):
+                    self._init_openai_client()
+                self.backend = OpenAIBackend(self.client)
+            else:
+                try:
+                    self.backend = get_backend(name)
+                except BackendUnavailable as e:
+                    raise ReelEngineError(str(e)) from e
+        return self.backend
+
+    def _backend_name(self):
+        """Name of the backend in use, or the configured one before it is created"""
+        return self.backend.name if self.backend else backend_name()
+
+    def _cache_model(self, model):
+        """Model name as used in cache keys - transcripts from other backends never mix with the API's"""
+        name = self._backend_name()
+        return model if name == 'openai' else f"{name}/{model}"
+
+    def _backend_label(self):
+        """Human-readable name of the backend for progress messages"""
+        backend = self.backend or BACKENDS.get(backend_name())
+        return getattr(backend, 'label', 'Whisper')
+
+    def transcribe_audio(self, audio, model="whisper-1", deadline=None, on_failure=None):
+        """Transcribe audio with the configured backend (OpenAI Whisper API by default)
+
+        audio is either a file path or a file-like buffer from extract_audio.
+        Returns a dict with text, language, duration and segments, or None
+        after calling on_failure(kind) with the errors.classify() kind.
+        """
+        deadline = deadline or Deadline()
+        try:
+            return self._get_backend().transcribe(audio, model, timeout=deadline.timeout(None, 'transcription'))
+        except Exception as e:
+            self._transcription_failed(e, on_failure)
+            return None
+
+    def _transcription_failed(self, error, on_failure):
+        if on_failure:
+            on_failure(errors.classify(error))
+        self._message('error', f"Error transcribing audio: {str(error)}")
+
+    def _audio_size(self, audio):
+        """Size in bytes of an audio path or buffer"""
+        if isinstance(audio, (str, os.PathLike)):
+            return os.path.getsize(audio)
+        size = audio.seek(0, os.SEEK_END)
+        audio.seek(0)
+        return size
+
+    def _transcribe_chunked(self, video_path, model, deadline=None, on_failure=None):
+        """Split long audio at silences and transcribe the chunks in parallel"""
+        import audio_chunking
+
+        deadline = deadline or Deadline()
+        try:
+            samples = audio_chunking.decode_pcm(video_path, timeout=deadline.timeout(120, 'audio extraction'))
+        except Exception as e:
+            self._message('error', f"Error extracting audio: {str(e)}")
+            return None
+
+        return self._transcribe_samples(samples, model, deadline, on_failure)
+
+    def _transcribe_with_vad(self, video_path, model, deadline=None, on_failure=None):
+        """Cut non-speech from the audio, transcribe the rest and map times back"""
+        import audio_chunking
+        import voice_activity
+
+        deadline = deadline or Deadline()
+        try:
+            samples = audio_chunking.decode_pcm(video_path, timeout=deadline.timeout(120, 'audio extraction'))
+            spans = voice_activity.detect_speech(samples)
+        except Exception as e:
+            self._message('error', f"Error extracting audio: {str(e)}")
+            return None
+
+        original_duration = round(len(samples) / audio_chunking.SAMPLE_RATE, 3)
+        if not spans:
+            self._message('warning', "No speech detected in this reel")
+            return {"text": "", "language": None, "duration": original_duration, "segments": [],
+                    "speech_seconds": 0.0}
+
+        trimmed, time_map = voice_activity.trim(samples, spans)
+        speech_seconds = round(len(trimmed) / audio_chunking.SAMPLE_RATE, 3)
+        if original_duration - speech_seconds >= 1:
+            self._message('info', f"✂️ Skipping {original_duration - speech_seconds:.0f}s without speech")
+
+        transcript = self._transcribe_samples(trimmed, model, deadline, on_failure)
+        if transcript is None:
+            return None
+        return {**voice_activity.remap_transcript(transcript, time_map, original_duration),
+                "speech_seconds": speech_seconds}
+
+    def _transcribe_samples(self, samples, model, deadline=None, on_failure=None):
+        """Transcribe decoded PCM, in parallel chunks split at silences when it is long
+
+        The first failed chunk fails the transcript; chunks not yet
+        uploaded are dropped.
+        """
+        import audio_chunking
+
+        deadline = deadline or Deadline()
+        duration = len(samples) / audio_chunking.SAMPLE_RATE
+        splits = audio_chunking.find_split_points(samples, self.chunk_seconds)
+        chunks = audio_chunking.plan_chunks(duration, splits)
+
+        if len(chunks) > 1:
+            self._progress(STAGE_AUDIO_EXTRACTED, 55, f"🎵 Audio split into {len(chunks)} chunks")
+            self._progress(STAGE_TRANSCRIBING, 60, f"🎤 Transcribing {len(chunks)} chunks with {self._backend_label()}...")
+        else:
+            self._progress(STAGE_AUDIO_EXTRACTED, 55, "🎵 Audio extracted")
+            self._progress(STAGE_TRANSCRIBING, 60, f"🎤 Transcribing audio with {self._backend_label()}...")
+
+        def transcribe_chunk(chunk):
+            # Runs in a worker thread - raise instead of reporting to the front-end
+            buffer = audio_chunking.encode_chunk(samples, chunk, self.audio_profile,
+                                                 timeout=deadline.timeout(60, 'audio encoding'))
+            sizes.append(self._audio_size(buffer))
+            return backend.transcribe(buffer, model, timeout=deadline.timeout(None, 'transcription'))
+
+        sizes = []
+        try:
+            backend = self._get_backend()
+            workers = min(len(chunks), self.transcribe_concurrency, backend.concurrency or len(chunks))
+            with ThreadPoolExecutor(max_workers=workers) as pool:
+                futures = [pool.submit(profiling.carry(transcribe_chunk), chunk) for chunk in chunks]
+                try:
+                    transcripts = [future.result() for future in futures]
+                except Exception:
+                    for future in futures:
+                        future.cancel()
+                    raise
+        except Exception as e:
+            self._transcription_failed(e, on_failure)
+            return None
+
+        return {**audio_chunking.stitch_transcripts(chunks, transcripts), "audio_bytes": sum(sizes)}
+
+    def _run_in_pool(self, pool, failed, kind, *args, deadline=None):
+        """Run a stage in the worker pool, relaying its messages on this thread
+
+        The worker gets what is left of the deadline; this thread stops
+        waiting once it runs out.
+        """
+        deadline = deadline or Deadline()
+        future, messages = pool.submit(kind, *args, deadline.remaining())
+        try:
+            while True:
+                try:
+                    return future.result(timeout=0.5)
+                except FutureTimeoutError:
+                    if deadline.expired():
+                        return failed
+                finally:
+                    while not messages.empty():
+                        self._message(*messages.get())
+        except Exception as e:
+            self._message('error', f"Worker process failed: {str(e)}")
+            return failed
+
+    def extract_reel_data(self, reel_url, model="whisper-1", profile=None, deadline=None):
+        """
+        Extract complete data from Instagram reel using OpenAI API
+
+        Args:
+            reel_url (str): Instagram reel URL
+            model (str): Whisper model to use
+            profile (str): Profiling mode for this run ('cprofile' or
+                'sample'); defaults to REEL_PROFILE
+            deadline (float or Deadline): Time budget for the whole job in
+                seconds; defaults to REEL_JOB_DEADLINE_SECONDS
+
+        Returns:
+            dict: Extracted data from the reel
+        """
+        if not isinstance(deadline, Deadline):
+            deadline = Deadline.for_job(deadline)
+
+        profile = profile or os.getenv('REEL_PROFILE')
+        if not profile:
+            return self._extract_reel_data(reel_url, model, deadline)
+
+        mode = profiling.parse_mode(profile)
+        if not mode:
+            return self._extract_reel_data(reel_url, model, deadline)
+        result, name = profiling.run_profiled(
+            mode, self.get_shortcode(reel_url) or 'extract', self._extract_reel_data, reel_url, model, deadline
+        )
+        self._message('info', f"📈 Profile saved: {name}")
+        result["profile"] = name
+        return result
+
+    def _extract_reel_data(self, reel_url, model, deadline):
+        start = time.perf_counter()
+        outcome = "failure"
+        try:
+            # Serve repeated requests for the same reel and model from cache
+            shortcode = self.get_shortcode(reel_url)
+            cached = self._cached_result(shortcode, model, reel_url)
+            if cached:
+                outcome = "cached"
+                self._progress(STAGE_COMPLETE, 100, "✅ Complete!")
+                return cached
+
+            # Known-dead reels are answered without a network call
+            failure = self._known_failure(shortcode)
+            if self.negative_cache and shortcode:
+                metrics.cache_lookup('negative', bool(failure))
+            if failure:
+                outcome = "known_failure"
+                return self._permanent_failure(failure["reason"])
+
+            # A missing API key or unusable backend fails before any download
+            try:
+                self._get_backend()
+            except ReelEngineError as e:
+                return {
+                    "success": False,
+                    "error": f"⚠️ {str(e)}",
+                    "error_kind": errors.PERMANENT,
+                    "data": None
+                }
+
+            def run():
+                # Every job gets a private workspace that is removed however it ends
+                with JobWorkspace() as workspace:
+                    return self._run_pipeline(reel_url, model, shortcode, workspace, deadline)
+
+            if not shortcode:
+                result, shared = run(), False
+            else:
+                # Identical requests in flight (this process or another) share one run
+                result, shared = get_single_flight().do(
+                    f"{shortcode}:{self._cache_model(model)}",
+                    run,
+                    recheck=lambda: self._cached_result(shortcode, model, reel_url),
+                    on_wait=lambda: self._message('info', "⏳ This reel is already being processed, waiting for that result..."),
+                    deadline=deadline
+                )
+            if shared and result.get("success"):
+                for item in result.get("data") or []:
+                    item["url"] = reel_url
+                self._progress(STAGE_COMPLETE, 100, "✅ Complete!")
+            if result.get("success"):
+                outcome = "shared" if shared else "success"
+            return result
+
+        except DeadlineExceeded as e:
+            outcome = "deadline"
+            self._message('error', f"⏱️ {str(e)}")
+            return {
+                "success": False,
+                "error": f"⏱️ {str(e)}",
+                "error_kind": "deadline",
+                "data": None
+            }
+        except Exception as e:
+            return {
+                "success": False,
+                "error": str(e),
+                "error_kind": errors.classify(e),
+                "data": None
+            }
+        finally:
+            metrics.JOBS.labels(outcome).inc()
+            metrics.JOB_SECONDS.labels(outcome).observe(time.perf_counter() - start)
+
+    def _known_failure(self, shortcode):
+        """Return the negative-cache entry for a reel, or None"""
+        if not self.negative_cache or not shortcode:
+            return None
+        return self.negative_cache.get_failure(shortcode)
+
+    def _remember_failure(self, url, error):
+        """Record a permanent failure so the reel is not fetched again for a while"""
+        shortcode = self.get_shortcode(url)
+        if not self.negative_cache or not shortcode:
+            return
+        try:
+            self.negative_cache.set_failure(shortcode, errors.permanent_reason(error) or str(error)[:200], error)
+        except OSError:
+            pass  # Caching is best-effort
+
+    def _stage_failure(self, error, kinds):
+        """Failure result for a pipeline stage, with the worst errors.classify() kind it saw"""
+        return {
+            "success": False,
+            "error": error,
+            "error_kind": errors.worst(kinds),
+            "data": None
+        }
+
+    def _permanent_failure(self, reason):
+        return {
+            "success": False,
+            "error": f"❌ **{reason}**\n\nThis reel cannot be processed, so it was not retried.",
+            "error_kind": errors.PERMANENT,
+            "data": None
+        }
+
+    def _cached_result(self, shortcode, model, reel_url):
+        """Return a finished response from the transcript cache, or None"""
+        if not self.cache or not shortcode:
+            return None
+
+        cached = self.cache.get_result(shortcode, self._cache_model(model))
+        metrics.cache_lookup('transcript', bool(cached))
+        if not cached:
+            return None
+
+        cached["url"] = reel_url
+        cached["metadata"]["cached"] = True
+        return {
+            "success": True,
+            "data": [cached],
+            "total_items": 1
+        }
+
+    def _run_pipeline(self, reel_url, model, shortcode, workspace, deadline):
+        """Download, extract audio and transcribe one reel inside its workspace
+
+        A stage that fails after the deadline ran out raises DeadlineExceeded
+        so the job ends as timed out rather than as a stage error.
+        """
+        # Step 1: Download video
+        self._progress(STAGE_DOWNLOADING, 10, "📥 Downloading Instagram video...")
+
+        pool = get_worker_pool()
+        failures = []  # errors.classify() kinds of the failed attempts
+        with metrics.stage('download') as stage:
+            if pool:
+                # A warm worker process downloads into our workspace
+                video_path, video_info, failure_kind = self._run_in_pool(
+                    pool, (None, None, errors.TRANSIENT), TASK_DOWNLOAD, reel_url, workspace.open().path,
+                    workspace.quota_bytes, deadline=deadline
+                )
+                failures.append(failure_kind)
+            else:
+                # Primary and alternative strategies race; the first file wins
+                video_path, video_info = self.download_hedged(reel_url, workspace, deadline, failures.append)
+            stage.failed = not video_path
+
+        if not video_path:
+            deadline.check('download')
+            failure = self._known_failure(shortcode)
+            if failure:
+                return self._permanent_failure(failure["reason"])
+            return self._stage_failure(DOWNLOAD_FAILED_ERROR, failures)
+
+        workspace.check_quota()
+        download_stats = self._download_stats(video_info, video_path)
+        metrics.DOWNLOAD_BYTES.inc(download_stats["download_bytes"])
+        self._progress(STAGE_DOWNLOADED, 35, "📥 Video downloaded")
+        if download_stats["download_bytes_saved"]:
+            self._message('info', f"📉 Audio-first download saved {download_stats['download_bytes_saved'] / 1048576:.1f} MB")
+
+        # Step 2: Extract audio
+        self._progress(STAGE_EXTRACTING_AUDIO, 40, "🎵 Extracting audio from video...")
+
+        # Long media is split at silences and transcribed in parallel chunks
+        duration = (video_info or {}).get('duration') or 0
+        audio = None
+        single_upload = duration <= self.chunk_seconds * 2
+
+        # In size-target mode the bitrate is chosen so the reel fits one upload
+        bitrate = None
+        if self.size_target:
+            bitrate = audio_codecs.target_bitrate(self.audio_profile, duration, self.max_upload_bytes)
+            single_upload = single_upload or bitrate is not None
+
+        if not self.vad and single_upload:
+            with metrics.stage('extract_audio') as stage:
+                if pool:
+                    audio = self._run_in_pool(pool, None, TASK_EXTRACT_AUDIO, video_path, bitrate, deadline=deadline)
+                else:
+                    audio = self.extract_audio(video_path, bitrate=bitrate, deadline=deadline)
+                stage.failed = not audio
+            if not audio:
+                deadline.check('audio extraction')
+                return self._stage_failure("Failed to extract audio", [])
+            workspace.check_quota()
+
+            audio_bytes = self._audio_size(audio)
+            if audio_bytes > self.max_upload_bytes:
+                # Too large for a single upload
+                if hasattr(audio, 'close'):
+                    audio.close()
+                audio = None
+
+        failures = []
+        with metrics.stage('transcribe') as stage:
+            if self.vad:
+                # Non-speech is cut before upload and segment times mapped back
+                transcript = self._transcribe_with_vad(video_path, model, deadline, failures.append)
+            elif audio is None:
+                transcript = self._transcribe_chunked(video_path, model, deadline, failures.append)
+            else:
+                self._progress(STAGE_AUDIO_EXTRACTED, 55, "🎵 Audio extracted")
+
+                # Step 3: Transcribe audio
+                self._progress(STAGE_TRANSCRIBING, 60, f"🎤 Transcribing audio with {self._backend_label()}...")
+
+                try:
+                    transcript = self.transcribe_audio(audio, model, deadline, failures.append)
+                finally:
+                    if hasattr(audio, 'close'):
+                        audio.close()
+                if transcript:
+                    transcript["audio_bytes"] = audio_bytes
+                    transcript["audio_bitrate"] = bitrate
+            stage.failed = not transcript
+        if not transcript:
+            deadline.check('transcription')
+            if errors.PERMANENT in failures:
+                # Bad key, no quota, unknown model or rejected audio - retrying cannot help
+                return self._stage_failure(
+                    "❌ **The transcription service rejected the request**\n\n"
+                    "Check the API key, quota and model; the request was not retried.", failures
+                )
+            return self._stage_failure("Failed to transcribe audio", failures)
+
+        metrics.UPLOAD_BYTES.inc(transcript.get("audio_bytes") or 0)
+        self._progress(STAGE_TRANSCRIBED, 85, "🎤 Audio transcribed")
+
+        # Step 4: Process results
+        self._progress(STAGE_FORMATTING, 90, "📊 Processing results...")
+
+        with metrics.stage('format'):
+            # Format results
+            result = {
+                "url": reel_url,
+                "transcript": transcript["text"],
+                "language": transcript["language"],
+                "duration": transcript["duration"],
+                "segments": transcript["segments"],
+                "metadata": {
+                    "model_used": model,
+                    "transcription_backend": self._backend_name(),
+                    "video_title": video_info.get('title', 'Unknown') if video_info else 'Unknown',
+                    "uploader": video_info.get('uploader', 'Unknown') if video_info else 'Unknown',
+                    "view_count": video_info.get('view_count', 0) if video_info else 0,
+                    "like_count": video_info.get('like_count', 0) if video_info else 0,
+                    "description": video_info.get('description', '') if video_info else '',
+                    **download_stats,
+                }
+            }
+            result["metadata"]["audio_profile"] = self.audio_profile["name"]
+            # Only the single upload is encoded at the size-target bitrate;
+            # chunks are encoded at the profile's own
+            result["metadata"]["audio_bitrate"] = transcript.get("audio_bitrate") or self.audio_profile["bitrate"]
+            for key in ("audio_bytes", "speech_seconds"):
+                if key in transcript:
+                    result["metadata"][key] = transcript[key]
+
+            if self.cache and shortcode:
+                try:
+                    self.cache.set_result(shortcode, self._cache_model(model), result)
+                except Exception:
+                    pass  # Caching is best-effort
+
+        self._progress(STAGE_COMPLETE, 100, "✅ Complete!")
+
+        return {
+            "success": True,
+            "data": [result],
+            "total_items": 1
+        }
+
+
+def main():
+    """Command-line front-end: extract one reel and print the result as JSON"""
+    import argparse
+    import json
+    import sys
+    from dotenv import load_dotenv
+
+    load_dotenv()
+
+    parser = argparse.ArgumentParser(description="Extract transcript data from an Instagram reel")
+    parser.add_argument("url", help="Instagram reel, post, or TV video URL")
+    parser.add_argument("--model", default="whisper-1", help="Whisper model to use")
+    args = parser.parse_args()
+
+    engine = ReelTranscriptEngine(
+        on_progress=lambda stage, percent, message: print(f"[{percent:3d}%] {message}", file=sys.stderr),
+        on_message=lambda level, message: print(f"{level}: {message}", file=sys.stderr),
+    )
+
+    result = engine.extract_reel_data(args.url, args.model)
+    print(json.dumps(result, indent=2))
+    return 0 if result.get("success") else 1
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,152 @@
+"""
+Single-flight request coalescing
+
+When many requests for the same reel arrive together, only the first one
+does the work:
+
+- within a process, concurrent callers for a key attach to the leader's
+  future and receive the same result
+- across processes on one host, the leader holds an flock on the key's
+  lock file; a leader in another process polls for that lock and then
+  re-checks the shared on-disk cache before doing any work itself
+
+Lock files are removed by the process that held them. Waiters give up
+when their deadline runs out.
+"""
+
+import os
+import copy
+import time
+import hashlib
+import threading
+from concurrent.futures import Future, TimeoutError as FutureTimeoutError
+from reel_cache import cache_root
+from deadline import Deadline
+
+try:
+    import fcntl
+except ImportError:  # Windows - coalescing stays in-process
+    fcntl = None
+
+LOCK_POLL_SECONDS = 0.25
+
+
+class SingleFlight:
+    def __init__(self, lock_dir=None):
+        self.lock_dir = lock_dir or os.getenv('REEL_LOCK_DIR', os.path.join(cache_root(), 'locks'))
+        self._inflight = {}
+        self._lock = threading.Lock()
+
+    def do(self, key, fn, recheck=None, on_wait=None, deadline=None):
+        """Run fn() once per key among concurrent callers
+
+        recheck() is called after waiting on another process; if it returns a
+        result, that is used instead of running fn. on_wait() is called when
+        this caller has to wait for someone else. Returns (result, shared)
+        where shared is True when the result came from another caller.
+        Waiting raises DeadlineExceeded once the deadline runs out.
+        """
+        deadline = deadline or Deadline()
+        with self._lock:
+            future = self._inflight.get(key)
+            leader = future is None
+            if leader:
+                future = Future()
+                self._inflight[key] = future
+
+        if not leader:
+            if on_wait:
+                on_wait()
+            while True:
+                try:
+                    # Copy so callers can't modify each other's result
+                    return copy.deepcopy(future.result(timeout=LOCK_POLL_SECONDS)), True
+                except FutureTimeoutError:
+                    deadline.check('the wait for another request')
+
+        try:
+            result, shared = self._run_across_processes(key, fn, recheck, on_wait, deadline)
+            future.set_result(result)
+            return result, shared
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        finally:
+            with self._lock:
+                del self._inflight[key]
+
+    def _lock_path(self, key):
+        return os.path.join(self.lock_dir, hashlib.sha256(key.encode('utf-8')).hexdigest()[:32] + '.lock')
+
+    def _run_across_processes(self, key, fn, recheck, on_wait, deadline):
+        if fcntl is None:
+            return fn(), False
+
+        path = self._lock_path(key)
+        try:
+            os.makedirs(self.lock_dir, exist_ok=True)
+            lock_file, waited = self._acquire(path, on_wait, deadline)
+        except OSError:
+            return fn(), False
+
+        try:
+            if waited and recheck:
+                result = recheck()
+                if result is not None:
+                    return result, True
+            return fn(), False
+        finally:
+            # Unlink before unlocking: waiters on this file notice it is gone
+            try:
+                os.unlink(path)
+            except OSError:
+                pass
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
+            lock_file.close()
+
+    def _acquire(self, path, on_wait, deadline):
+        """Lock the key's file, polling while another process holds it
+
+        Returns (open lock file, whether we had to wait).
+        """
+        waited = False
+        while True:
+            lock_file = open(path, 'a')
+            try:
+                while True:
+                    try:
+                        fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                        break
+                    except BlockingIOError:
+                        # Another process is working on this key
+                        if not waited and on_wait:
+                            on_wait()
+                        waited = True
+                        deadline.check('the wait for another request')
+                        time.sleep(LOCK_POLL_SECONDS)
+            except BaseException:
+                lock_file.close()
+                raise
+
+            # The previous holder may have removed the file meanwhile; its
+            # successor then locks a new one, so ours must be that file too
+            try:
+                if os.fstat(lock_file.fileno()).st_ino == os.stat(path).st_ino:
+                    return lock_file, waited
+            except FileNotFoundError:
+                pass
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
+            lock_file.close()
+
+
+_single_flight = None
+_single_flight_lock = threading.Lock()
+
+
+def get_single_flight():
+    """Return the process-wide SingleFlight instance"""
+    global _single_flight
+    with _single_flight_lock:
+        if _single_flight is None:
+            _single_flight = SingleFlight()
+        return _single_flight
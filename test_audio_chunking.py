@@ -0,0 +1,91 @@
+"""
+Unit tests for silence-aware chunking in audio_chunking.py
+
+    python -m pytest test_audio_chunking.py
+"""
+
+import numpy as np
+import pytest
+
+import audio_chunking
+from audio_chunking import SAMPLE_RATE
+
+
+def test_short_audio_is_not_split():
+    assert audio_chunking.find_split_points(np.ones(10 * SAMPLE_RATE, dtype=np.int16), 60) == []
+
+
+def test_splits_land_in_the_quietest_stretch():
+    rng = np.random.default_rng(1)
+    samples = rng.normal(0, 3000, 100 * SAMPLE_RATE)
+    samples[50 * SAMPLE_RATE:51 * SAMPLE_RATE] = 0  # The only pause before the 60 s boundary
+
+    splits = audio_chunking.find_split_points(samples.astype(np.int16), 60, search_seconds=30)
+
+    assert len(splits) == 1
+    assert 50.0 <= splits[0] <= 51.0
+
+
+def test_splits_fall_back_to_the_boundary_without_a_window():
+    samples = np.ones(10 * SAMPLE_RATE, dtype=np.int16)
+    assert audio_chunking.find_split_points(samples, 4, search_seconds=0) == [4.0, 8.0]
+
+
+def test_chunks_overlap_but_own_disjoint_ranges():
+    chunks = audio_chunking.plan_chunks(100.0, [40.0, 75.0], overlap=1.0)
+
+    assert [(c["start"], c["end"]) for c in chunks] == [(0.0, 41.0), (39.0, 76.0), (74.0, 100.0)]
+    assert [(c["own_start"], c["own_end"]) for c in chunks] == [(0.0, 40.0), (40.0, 75.0), (75.0, 100.0)]
+
+
+def transcript(segments, language="english"):
+    return {
+        "text": "".join(text for _, _, text in segments),
+        "language": language,
+        "duration": segments[-1][1] if segments else 0,
+        "segments": [{"start": start, "end": end, "text": text} for start, end, text in segments],
+    }
+
+
+def test_stitching_shifts_times_and_keeps_only_owned_segments():
+    chunks = audio_chunking.plan_chunks(20.0, [10.0], overlap=1.0)
+    first = transcript([(0.0, 4.0, " Hello there."), (4.0, 9.5, " How are you?"), (9.5, 11.0, " Fine,")])
+    # The second chunk starts at 9 s, so it repeats the words around the cut
+    second = transcript([(0.0, 0.5, " you?"), (0.5, 2.0, " Fine,"), (2.0, 6.0, " thanks.")], language=None)
+
+    stitched = audio_chunking.stitch_transcripts(chunks, [first, second])
+
+    assert [(seg["start"], seg["end"], seg["text"]) for seg in stitched["segments"]] == [
+        (0.0, 4.0, " Hello there."),
+        (4.0, 9.5, " How are you?"),
+        (9.5, 11.0, " Fine,"),  # The second chunk's copy - its midpoint is past the cut
+        (11.0, 15.0, " thanks."),
+    ]
+    assert stitched["text"] == "Hello there. How are you? Fine, thanks."
+    assert stitched["language"] == "english"
+    assert stitched["duration"] == 20.0
+
+
+def test_stitching_drops_overlap_duplicates():
+    chunks = audio_chunking.plan_chunks(20.0, [10.0], overlap=1.0)
+    # Both chunks hear "Fine," across the cut and time it differently, so
+    # each one owns its own copy
+    first = transcript([(0.0, 9.0, " How are you?"), (9.0, 10.8, " Fine,")])
+    second = transcript([(0.4, 2.0, " fine"), (2.0, 6.0, " thanks.")])
+
+    stitched = audio_chunking.stitch_transcripts(chunks, [first, second])
+
+    assert [(seg["start"], seg["end"], seg["text"]) for seg in stitched["segments"]] == [
+        (0.0, 9.0, " How are you?"),
+        (9.0, 10.8, " Fine,"),
+        (11.0, 15.0, " thanks."),
+    ]
+
+
+@pytest.mark.parametrize("a, b, same", [
+    (" Fine,", "fine", True),
+    ("Don't stop!", "dont stop", True),
+    ("Fine", "Find", False),
+])
+def test_texts_compare_without_case_or_punctuation(a, b, same):
+    assert audio_chunking._same_text(a, b) is same
@@ -0,0 +1,70 @@
+"""
+Unit tests for the failure taxonomy in errors.py
+
+    python -m pytest test_errors.py
+"""
+
+import pytest
+
+import errors
+from deadline import DeadlineExceeded
+
+
+class ApiError(Exception):
+    """Stand-in for an httpx-based API error"""
+
+    def __init__(self, status_code, code=None):
+        super().__init__(f"Error code: {status_code}")
+        self.status_code = status_code
+        self.code = code
+
+
+@pytest.mark.parametrize("message", [
+    "ERROR: [Instagram] ABC123: Requested content is not available, rate-limit reached or login required",
+    "HTTP Error 429: Too Many Requests",
+    "Please wait a few minutes before you try again.",
+])
+def test_throttling_is_rate_limited(message):
+    assert errors.classify(message) == errors.RATE_LIMITED
+
+
+@pytest.mark.parametrize("message, reason", [
+    ("This content is not available", "The reel is not available"),
+    ("ERROR: [Instagram] ABC123: This content isn't available", "The reel is not available"),
+    ("ERROR: [Instagram] ABC123: This account is private", "The reel belongs to a private account"),
+    ("Main webpage is locked behind the login page: login required",
+     "The reel is only visible to logged-in users"),
+    ("This reel has been removed", "The reel was deleted or does not exist"),
+    ("HTTP Error 404: Not Found", "The reel was not found"),
+    ("Media file is larger than max-filesize (the job's 500.0 MB quota)", "The media is too large to process"),
+])
+def test_dead_reels_are_permanent(message, reason):
+    assert errors.classify(message) == errors.PERMANENT
+    assert errors.permanent_reason(message) == reason
+
+
+@pytest.mark.parametrize("message", [
+    "unable to open for writing: [Errno 28] No space left on device: '/private/var/folders/x/media.mp4'",
+    "Requested format is not available. Use --list-formats for a list of available formats",
+    "HTTP Error 503: Service Unavailable",
+    "The read operation timed out",
+])
+def test_other_failures_are_transient(message):
+    assert errors.classify(message) == errors.TRANSIENT
+
+
+def test_api_errors_use_the_status_code():
+    assert errors.classify(ApiError(429)) == errors.RATE_LIMITED
+    assert errors.classify(ApiError(401)) == errors.PERMANENT
+    assert errors.classify(ApiError(429, code='insufficient_quota')) == errors.PERMANENT
+    assert errors.classify(ApiError(500)) == errors.TRANSIENT
+
+
+def test_deadline_errors_are_permanent():
+    assert errors.classify(DeadlineExceeded("Job deadline of 5s exceeded during download")) == errors.PERMANENT
+
+
+def test_worst_kind_wins():
+    assert errors.worst([errors.TRANSIENT, errors.RATE_LIMITED, errors.TRANSIENT]) == errors.RATE_LIMITED
+    assert errors.worst([errors.RATE_LIMITED, errors.PERMANENT]) == errors.PERMANENT
+    assert errors.worst([]) == errors.TRANSIENT
@@ -0,0 +1,92 @@
+"""
+Unit tests for voice-activity trimming in voice_activity.py
+
+    python -m pytest test_voice_activity.py
+"""
+
+import numpy as np
+
+import voice_activity
+from audio_chunking import SAMPLE_RATE
+
+SETTINGS = dict(margin_db=12, min_silence_ms=700, pad_ms=200)
+
+
+def speech(seconds, level_db, rng):
+    """Syllable-like noise bursts, each up to 25 dB quieter than level_db"""
+    out = np.zeros(int(seconds * SAMPLE_RATE))
+    t = 0
+    while t < len(out):
+        length = min(int(rng.uniform(0.12, 0.35) * SAMPLE_RATE), len(out) - t)
+        amplitude = 32768 * 10 ** ((level_db - rng.uniform(0, 25)) / 20)
+        out[t:t + length] = rng.normal(0, amplitude, length) * np.hanning(length)
+        t += length + int(rng.uniform(0.0, 0.08) * SAMPLE_RATE)
+    return out
+
+
+def music(seconds, level_db):
+    t = np.arange(int(seconds * SAMPLE_RATE)) / SAMPLE_RATE
+    return 32768 * 10 ** (level_db / 20) * (np.sin(2 * np.pi * 220 * t) + 0.5 * np.sin(2 * np.pi * 330 * t)) / 1.5
+
+
+def kept_seconds(spans):
+    return sum(end - start for start, end in spans)
+
+
+def test_quiet_speech_over_a_music_bed_is_kept():
+    rng = np.random.default_rng(1)
+    clip = (speech(30, -12, rng) + music(30, -32)).astype(np.int16)
+
+    spans = voice_activity.detect_speech(clip, **SETTINGS)
+
+    # No real pauses: the quietest tenth is quiet speech, not noise
+    assert kept_seconds(spans) >= 29.5
+
+
+def test_real_pauses_are_cut():
+    rng = np.random.default_rng(2)
+    silence = lambda seconds: rng.normal(0, 30, int(seconds * SAMPLE_RATE))
+    clip = np.concatenate([speech(5, -12, rng), silence(4), speech(5, -12, rng)]).astype(np.int16)
+
+    spans = voice_activity.detect_speech(clip, **SETTINGS)
+
+    assert len(spans) == 2
+    assert spans[0][1] < 5.5 and spans[1][0] > 8.5
+    assert 9.5 <= kept_seconds(spans) <= 11
+
+
+def test_silence_has_no_speech():
+    assert voice_activity.detect_speech(np.zeros(3 * SAMPLE_RATE, dtype=np.int16), **SETTINGS) == []
+
+
+def test_trim_keeps_only_the_spans():
+    samples = np.arange(10 * SAMPLE_RATE, dtype=np.int32)
+
+    trimmed, time_map = voice_activity.trim(samples, [(1.0, 2.0), (5.0, 6.5)])
+
+    assert len(trimmed) == int(2.5 * SAMPLE_RATE)
+    assert trimmed[0] == SAMPLE_RATE and trimmed[SAMPLE_RATE] == 5 * SAMPLE_RATE
+    assert time_map == [(0.0, 1.0, 1.0), (1.0, 5.0, 1.5)]
+
+
+def test_times_map_across_a_join():
+    time_map = [(0.0, 1.0, 1.0), (1.0, 5.0, 1.5)]
+
+    assert voice_activity.map_time(0.5, time_map) == 1.5
+    assert voice_activity.map_time(1.75, time_map) == 5.75
+    # On the join a start belongs to the next span and an end to the previous one
+    assert voice_activity.map_time(1.0, time_map) == 5.0
+    assert voice_activity.map_time(1.0, time_map, is_end=True) == 2.0
+
+
+def test_segments_are_remapped_onto_the_original_timeline():
+    time_map = [(0.0, 1.0, 1.0), (1.0, 5.0, 1.5)]
+    transcript = {"text": "one two", "language": "english", "duration": 2.5, "segments": [
+        {"start": 0.0, "end": 1.0, "text": " one"},
+        {"start": 1.0, "end": 2.5, "text": " two"},
+    ]}
+
+    remapped = voice_activity.remap_transcript(transcript, time_map, 10.0)
+
+    assert remapped["duration"] == 10.0
+    assert [(seg["start"], seg["end"]) for seg in remapped["segments"]] == [(1.0, 2.0), (5.0, 6.5)]
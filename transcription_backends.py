@@ -0,0 +1,204 @@
+"""
+Transcription backends
+
+The engine hands audio (a file path or a file-like buffer) to a backend's
+transcribe(audio, model, timeout=None) and gets back a normalized
+transcript (timeout is the seconds left for the call, if bounded):
+
+    {"text": ..., "language": ..., "duration": ...,
+     "segments": [{"start": ..., "end": ..., "text": ...}, ...]}
+
+Backends are selected with REEL_TRANSCRIPTION_BACKEND:
+
+    openai  - OpenAI Whisper API (default)
+    local   - faster-whisper on the CPU with int8 weights, no network or
+              per-minute billing (pip install faster-whisper)
+    fake    - deterministic offline output for tests
+"""
+
+import os
+import hashlib
+import threading
+
+AUDIO_UPLOAD_NAME = 'audio.mp3'
+
+DEFAULT_LOCAL_MODEL = 'base'
+DEFAULT_LOCAL_COMPUTE_TYPE = 'int8'
+
+
+class BackendUnavailable(Exception):
+    """Raised when a configured backend cannot be used here"""
+
+
+def normalize_transcript(transcript):
+    """Convert a verbose_json response to a plain text/language/duration/segments dict"""
+    def field(obj, name, default=None):
+        return obj.get(name, default) if isinstance(obj, dict) else getattr(obj, name, default)
+
+    return {
+        "text": field(transcript, 'text', ''),
+        "language": field(transcript, 'language'),
+        "duration": field(transcript, 'duration'),
+        "segments": [
+            {
+                "start": field(seg, 'start'),
+                "end": field(seg, 'end'),
+                "text": field(seg, 'text', '')
+            } for seg in field(transcript, 'segments') or []
+        ],
+    }
+
+
+class OpenAIBackend:
+    """OpenAI Whisper API"""
+
+    name = 'openai'
+    label = 'OpenAI Whisper'
+    concurrency = None  # Limited only by the engine's REEL_TRANSCRIBE_CONCURRENCY
+
+    def __init__(self, client):
+        self.client = client
+
+    def transcribe(self, audio, model, timeout=None):
+        if isinstance(audio, (str, os.PathLike)):
+            with open(audio, 'rb') as audio_file:
+                return normalize_transcript(self._create(audio_file, model, timeout))
+
+        # Upload the in-memory buffer directly, no temp file involved
+        audio.seek(0)
+        name = getattr(audio, 'upload_name', AUDIO_UPLOAD_NAME)  # Set by the codec profile
+        return normalize_transcript(self._create((name, audio), model, timeout))
+
+    def _create(self, file, model, timeout=None):
+        options = {}
+        if timeout is not None:
+            # timeout is the budget for the whole call; the SDK retries on its own
+            options["timeout"] = timeout / (getattr(self.client, 'max_retries', 0) + 1)
+        return self.client.audio.transcriptions.create(
+            model=model,
+            file=file,
+            response_format="verbose_json",
+            timestamp_granularities=["segment"],
+            **options
+        )
+
+
+class LocalWhisperBackend:
+    """Whisper-family models run locally with faster-whisper (CTranslate2)
+
+    Models are loaded from REEL_LOCAL_MODEL_DIR - either a converted model
+    directory named after the model, or a cache faster-whisper downloads
+    into - and kept in memory for the life of the process. API model names
+    such as 'whisper-1' map to REEL_LOCAL_MODEL.
+    """
+
+    name = 'local'
+    label = 'local Whisper'
+    concurrency = 1  # CPU bound - one model call at a time uses every core
+
+    _models = {}
+    _models_lock = threading.Lock()
+
+    def __init__(self, model_dir=None, default_model=None, compute_type=None, cpu_threads=None):
+        try:
+            import faster_whisper  # noqa: F401
+        except ImportError as e:
+            raise BackendUnavailable("The local backend needs faster-whisper: pip install faster-whisper") from e
+
+        self.model_dir = model_dir or os.getenv('REEL_LOCAL_MODEL_DIR')
+        self.default_model = default_model or os.getenv('REEL_LOCAL_MODEL', DEFAULT_LOCAL_MODEL)
+        self.compute_type = compute_type or os.getenv('REEL_LOCAL_COMPUTE_TYPE', DEFAULT_LOCAL_COMPUTE_TYPE)
+        self.cpu_threads = cpu_threads or int(os.getenv('REEL_LOCAL_CPU_THREADS', '0') or 0)
+
+    def _model(self, model):
+        name = self.default_model if model.startswith('whisper-') else model
+        with self._models_lock:
+            whisper = self._models.get((name, self.compute_type))
+            if whisper is None:
+                from faster_whisper import WhisperModel
+
+                local_path = os.path.join(self.model_dir, name) if self.model_dir else None
+                whisper = WhisperModel(
+                    local_path if local_path and os.path.isdir(local_path) else name,
+                    device='cpu',
+                    compute_type=self.compute_type,
+                    cpu_threads=self.cpu_threads,
+                    download_root=self.model_dir,
+                )
+                self._models[(name, self.compute_type)] = whisper
+            return whisper
+
+    def transcribe(self, audio, model, timeout=None):
+        # faster-whisper cannot be interrupted; the engine's deadline checks bound it
+        if not isinstance(audio, (str, os.PathLike)):
+            audio.seek(0)
+        segments, info = self._model(model).transcribe(audio, vad_filter=False)
+        segments = [{"start": seg.start, "end": seg.end, "text": seg.text} for seg in segments]
+        return {
+            "text": "".join(seg["text"] for seg in segments).strip(),
+            "language": info.language,
+            "duration": info.duration,
+            "segments": segments,
+        }
+
+
+class FakeBackend:
+    """Deterministic transcripts derived from the audio bytes, for offline tests
+
+    The duration is estimated from the size at 24 kbit/s (what the engine's
+    16 kHz mono MP3 encodes to), and one segment is emitted every 5 seconds.
+    """
+
+    name = 'fake'
+    label = 'the fake backend'
+    concurrency = None
+    SEGMENT_SECONDS = 5
+    BYTES_PER_SECOND = 3000
+
+    def transcribe(self, audio, model, timeout=None):
+        if isinstance(audio, (str, os.PathLike)):
+            with open(audio, 'rb') as f:
+                data = f.read()
+        else:
+            audio.seek(0)
+            data = audio.read()
+            audio.seek(0)
+
+        digest = hashlib.sha256(data).hexdigest()[:12]
+        duration = round(len(data) / self.BYTES_PER_SECOND, 3)
+        segments = []
+        start = 0.0
+        while True:
+            end = min(duration, start + self.SEGMENT_SECONDS)
+            segments.append({"start": start, "end": end, "text": f" Segment {len(segments) + 1} of {digest}."})
+            start = end
+            if start >= duration:
+                break
+
+        return {
+            "text": "".join(seg["text"] for seg in segments).strip(),
+            "language": "en",
+            "duration": duration,
+            "segments": segments,
+        }
+
+
+BACKENDS = {
+    'openai': OpenAIBackend,
+    'local': LocalWhisperBackend,
+    'fake': FakeBackend,
+}
+
+
+def backend_name():
+    """Configured backend name"""
+    return os.getenv('REEL_TRANSCRIPTION_BACKEND', 'openai').strip().lower()
+
+
+def get_backend(name, client=None):
+    """Create a backend by name; the OpenAI backend needs an OpenAI client"""
+    if name not in BACKENDS:
+        raise BackendUnavailable(f"Unknown transcription backend: {name} (expected one of {', '.join(BACKENDS)})")
+    if name == 'openai':
+        return OpenAIBackend(client)
+    return BACKENDS[name]()
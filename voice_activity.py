@@ -0,0 +1,122 @@
+"""
+Voice-activity trimming
+
+Silent and near-silent stretches are cut from the decoded 16 kHz mono PCM
+before it is uploaded, so they are neither transferred nor billed. The cut
+audio comes with a time map, and remap_transcript() moves segment times
+from the trimmed audio back onto the original media's timeline.
+
+Detection is energy based: frames louder than the clip's own noise floor
+by REEL_VAD_MARGIN_DB are speech. The floor is the clip's quietest tenth,
+which is only noise when the clip has real pauses; in continuous talk over
+a music bed it is quiet speech. So anything within SPEECH_RANGE_DB of the
+clip's loud level is always kept, whatever the floor. Quiet gaps shorter
+than REEL_VAD_MIN_SILENCE_MS are kept so natural pauses survive.
+"""
+
+import os
+import bisect
+import numpy as np
+from audio_chunking import SAMPLE_RATE, frame_energy
+
+FRAME_MS = 30
+DEFAULT_MARGIN_DB = 12  # Speech must be this much louder than the noise floor
+ABSOLUTE_FLOOR_DBFS = -60  # Anything quieter is silence whatever the floor
+SPEECH_RANGE_DB = 30  # Quiet syllables sit this far below the loud ones
+DEFAULT_MIN_SILENCE_MS = 700  # Shorter pauses are kept
+DEFAULT_MIN_SPEECH_MS = 200  # Shorter blips are dropped
+DEFAULT_PAD_MS = 200  # Kept around every speech span so word edges survive
+
+
+def detect_speech(samples, sample_rate=SAMPLE_RATE, margin_db=None, min_silence_ms=None,
+                  min_speech_ms=None, pad_ms=None):
+    """Return speech spans as a list of (start, end) times in seconds"""
+    margin_db = margin_db if margin_db is not None else float(os.getenv('REEL_VAD_MARGIN_DB', DEFAULT_MARGIN_DB))
+    min_silence_ms = min_silence_ms if min_silence_ms is not None else \
+        int(os.getenv('REEL_VAD_MIN_SILENCE_MS', DEFAULT_MIN_SILENCE_MS))
+    min_speech_ms = min_speech_ms if min_speech_ms is not None else DEFAULT_MIN_SPEECH_MS
+    pad_ms = pad_ms if pad_ms is not None else int(os.getenv('REEL_VAD_PAD_MS', DEFAULT_PAD_MS))
+
+    energy = frame_energy(samples, sample_rate, FRAME_MS)
+    if len(energy) == 0:
+        return []
+
+    # Loudness in dB relative to full scale for int16 audio
+    db = 10 * np.log10(energy / (32768.0 ** 2) + 1e-12)
+    noise_floor, loud = np.percentile(db, [10, 90])
+    threshold = min(noise_floor + margin_db, loud - SPEECH_RANGE_DB)
+    voiced = db > max(threshold, ABSOLUTE_FLOOR_DBFS)
+
+    # Run boundaries of the voiced mask, in frames
+    edges = np.flatnonzero(np.diff(np.concatenate(([0], voiced.astype(np.int8), [0]))))
+    runs = edges.reshape(-1, 2)
+    if len(runs) == 0:
+        return []
+
+    frame_s = FRAME_MS / 1000
+    duration = len(samples) / sample_rate
+    spans = []
+    for start, end in runs * frame_s:
+        if spans and start - spans[-1][1] < min_silence_ms / 1000:
+            spans[-1][1] = end  # Bridge short pauses
+        else:
+            spans.append([start, end])
+
+    pad = pad_ms / 1000
+    padded = []
+    for start, end in spans:
+        if end - start < min_speech_ms / 1000:
+            continue
+        start, end = max(0.0, start - pad), min(duration, end + pad)
+        if padded and start <= padded[-1][1]:
+            padded[-1][1] = end
+        else:
+            padded.append([start, end])
+
+    return [(round(float(start), 3), round(float(end), 3)) for start, end in padded]
+
+
+def trim(samples, spans, sample_rate=SAMPLE_RATE):
+    """Keep only the speech spans
+
+    Returns (trimmed samples, time map). The time map is a list of
+    (trimmed_start, original_start, length) tuples, one per span.
+    """
+    pieces = []
+    time_map = []
+    position = 0.0
+    for start, end in spans:
+        piece = samples[int(start * sample_rate):int(end * sample_rate)]
+        pieces.append(piece)
+        time_map.append((position, start, len(piece) / sample_rate))
+        position += len(piece) / sample_rate
+
+    trimmed = np.concatenate(pieces) if pieces else samples[:0]
+    return trimmed, time_map
+
+
+def map_time(t, time_map, is_end=False):
+    """Map a time in the trimmed audio back to the original media
+
+    A time exactly on a join belongs to the span that ends there when it is
+    a segment end, and to the span that starts there otherwise.
+    """
+    if not time_map or t is None:
+        return t
+
+    starts = [entry[0] for entry in time_map]
+    index = (bisect.bisect_left(starts, t) if is_end else bisect.bisect_right(starts, t)) - 1
+    trimmed_start, original_start, length = time_map[max(0, index)]
+    return round(original_start + min(max(0.0, t - trimmed_start), length), 3)
+
+
+def remap_transcript(transcript, time_map, original_duration):
+    """Move a transcript of trimmed audio onto the original timeline"""
+    segments = [
+        {
+            "start": map_time(seg["start"], time_map),
+            "end": map_time(seg["end"], time_map, is_end=True),
+            "text": seg["text"],
+        } for seg in transcript.get("segments") or []
+    ]
+    return {**transcript, "duration": original_duration, "segments": segments}
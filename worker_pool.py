@@ -0,0 +1,213 @@
+"""
+Warm worker processes for the download and transcode stages
+
+yt-dlp extraction and ffmpeg supervision are moved out of the web process
+into long-lived workers. Each worker builds one engine at start-up and
+keeps it - with its yt-dlp instances and their HTTP connections - for many
+jobs, and is recycled after REEL_WORKER_MAX_JOBS jobs or once its RSS
+passes REEL_WORKER_MAX_RSS_MB.
+
+Enable it with REEL_WORKER_PROCESSES=<n>; the engine then sends its
+download and audio extraction stages here. The workers and the parent
+share one Instagram token bucket and cooldown (rate_limiter.SharedLimits).
+"""
+
+import os
+import time
+import queue
+import itertools
+import threading
+import multiprocessing
+from concurrent.futures import Future
+from rate_limiter import SharedLimits, share_limits
+
+DEFAULT_MAX_JOBS = 50
+DEFAULT_MAX_RSS_MB = 1024
+
+TASK_DOWNLOAD = "download"
+TASK_EXTRACT_AUDIO = "extract_audio"
+
+
+def _rss_mb():
+    """Resident set size of this process in MB"""
+    try:
+        with open('/proc/self/status') as f:
+            for line in f:
+                if line.startswith('VmRSS:'):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    try:
+        import resource
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    except ImportError:
+        return 0
+
+
+def _worker_main(worker_id, tasks, results, max_jobs, max_rss_mb, limits):
+    """Worker process loop: run tasks until it is time to recycle"""
+    share_limits(limits)  # Before the engine's first Instagram request
+
+    from reel_engine import ReelTranscriptEngine
+    from workspace import JobWorkspace
+    from deadline import Deadline
+    import errors
+
+    current = {"job_id": None}
+
+    def on_message(level, message):
+        results.put((current["job_id"], "message", (level, message)))
+
+    # Built once - yt-dlp instances and their connections survive across jobs
+    engine = ReelTranscriptEngine(on_message=on_message, reuse_downloaders=True)
+    results.put((None, "ready", worker_id))
+
+    jobs_done = 0
+    while True:
+        task = tasks.get()
+        if task is None:
+            break
+
+        job_id, kind, args = task
+        current["job_id"] = job_id
+        results.put((job_id, "start", worker_id))
+        try:
+            if kind == TASK_DOWNLOAD:
+                url, workspace_path, quota_bytes, remaining = args
+                workspace = JobWorkspace(quota_bytes=quota_bytes)
+                workspace.path = workspace_path  # Owned by the parent, not cleaned up here
+                failures = []
+                video_path, info = engine.download_hedged(url, workspace, Deadline(remaining), failures.append)
+                payload = (video_path, info, errors.worst(failures))
+            elif kind == TASK_EXTRACT_AUDIO:
+                video_path, bitrate, remaining = args
+                payload = engine.extract_audio(video_path, stream=False, bitrate=bitrate, deadline=Deadline(remaining))
+            else:
+                raise ValueError(f"Unknown task: {kind}")
+            results.put((job_id, "done", payload))
+        except Exception as e:
+            results.put((job_id, "error", str(e)))
+        current["job_id"] = None
+
+        jobs_done += 1
+        if jobs_done >= max_jobs or (max_rss_mb and _rss_mb() > max_rss_mb):
+            break  # The pool starts a fresh worker in our place
+
+    results.put((None, "exit", worker_id))
+
+
+class WorkerPool:
+    """Pool of pre-warmed, recyclable worker processes"""
+
+    def __init__(self, processes, max_jobs=None, max_rss_mb=None):
+        self.processes = processes
+        self.max_jobs = max_jobs or int(os.getenv('REEL_WORKER_MAX_JOBS', DEFAULT_MAX_JOBS))
+        self.max_rss_mb = max_rss_mb if max_rss_mb is not None else int(os.getenv('REEL_WORKER_MAX_RSS_MB', DEFAULT_MAX_RSS_MB))
+
+        # spawn: workers must not inherit the web process (Streamlit, Flask, threads)
+        self._ctx = multiprocessing.get_context('spawn')
+        self._tasks = self._ctx.Queue()
+        # One request rate and cooldown for the whole fleet, not one per worker
+        self.limits = SharedLimits(self._ctx)
+        share_limits(self.limits)
+        self._results = self._ctx.Queue()
+        self._workers = {}
+        self._worker_ids = itertools.count()
+        self._pending = {}  # job_id -> (future, message queue)
+        self._running = {}  # worker_id -> job_id
+        self._job_ids = itertools.count()
+        self._lock = threading.Lock()
+        self._closed = False
+
+        for _ in range(processes):
+            self._spawn()
+
+        threading.Thread(target=self._collect, name='worker-pool-results', daemon=True).start()
+        threading.Thread(target=self._supervise, name='worker-pool-supervisor', daemon=True).start()
+
+    def _spawn(self):
+        worker_id = next(self._worker_ids)
+        process = self._ctx.Process(
+            target=_worker_main,
+            args=(worker_id, self._tasks, self._results, self.max_jobs, self.max_rss_mb, self.limits),
+            name=f'reel-worker-{worker_id}',
+            daemon=True
+        )
+        process.start()
+        self._workers[worker_id] = process
+
+    def submit(self, kind, *args):
+        """Queue a task; returns (future, messages) where messages is a queue.Queue"""
+        job_id = next(self._job_ids)
+        future = Future()
+        messages = queue.Queue()
+        with self._lock:
+            self._pending[job_id] = (future, messages)
+        self._tasks.put((job_id, kind, args))
+        return future, messages
+
+    def _collect(self):
+        """Route worker results back to the matching futures"""
+        while True:
+            job_id, kind, payload = self._results.get()
+            with self._lock:
+                if kind == "start":
+                    self._running[payload] = job_id
+                    continue
+                if kind in ("ready", "exit"):
+                    continue
+                entry = self._pending.get(job_id)
+                if kind in ("done", "error"):
+                    self._pending.pop(job_id, None)
+                    self._running = {w: j for w, j in self._running.items() if j != job_id}
+            if not entry:
+                continue
+
+            future, messages = entry
+            if kind == "message":
+                messages.put(payload)
+            elif kind == "done":
+                future.set_result(payload)
+            else:
+                future.set_exception(RuntimeError(payload))
+
+    def _supervise(self):
+        """Replace workers that recycled themselves or crashed"""
+        while not self._closed:
+            time.sleep(0.5)
+            with self._lock:
+                for worker_id, process in list(self._workers.items()):
+                    if process.is_alive():
+                        continue
+                    del self._workers[worker_id]
+
+                    # A crashed worker takes its job with it
+                    job_id = self._running.pop(worker_id, None)
+                    entry = self._pending.pop(job_id, None) if job_id is not None else None
+                    if entry:
+                        entry[0].set_exception(RuntimeError(f"Worker process exited with code {process.exitcode}"))
+
+                    if not self._closed:
+                        self._spawn()
+
+    def shutdown(self):
+        """Stop all workers"""
+        self._closed = True
+        for _ in self._workers:
+            self._tasks.put(None)
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_worker_pool():
+    """Return the process-wide worker pool, or None when it is disabled"""
+    global _pool
+    processes = int(os.getenv('REEL_WORKER_PROCESSES', '0') or 0)
+    if processes <= 0:
+        return None
+    with _pool_lock:
+        if _pool is None:
+            _pool = WorkerPool(processes)
+        return _pool
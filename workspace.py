@@ -0,0 +1,152 @@
+import os
+import time
+import shutil
+import tempfile
+
+WORKSPACE_PREFIX = 'reeljob-'
+OWNER_FILE = '.owner'
+DEFAULT_QUOTA_BYTES = 500 * 1024 * 1024  # 500MB per job
+DEFAULT_MAX_AGE = 3600  # Workspaces older than this are orphans
+SWEEP_INTERVAL = 300  # Run the janitor at most every 5 minutes per process
+
+_last_sweep = 0.0
+
+
+class QuotaExceeded(Exception):
+    """Raised when a job writes more than its workspace quota"""
+
+
+def default_workspace_root():
+    """Directory that holds job workspaces
+
+    REEL_WORKSPACE_ROOT wins; otherwise REEL_WORKSPACE_TMPFS=1 puts
+    workspaces on /dev/shm when it is available.
+    """
+    root = os.getenv('REEL_WORKSPACE_ROOT')
+    if root:
+        return root
+
+    if os.getenv('REEL_WORKSPACE_TMPFS', '').lower() in ('1', 'true', 'yes') and \
+       os.path.isdir('/dev/shm') and os.access('/dev/shm', os.W_OK):
+        return os.path.join('/dev/shm', 'reel_workspaces')
+
+    return os.path.join(tempfile.gettempdir(), 'reel_workspaces')
+
+
+class JobWorkspace:
+    """Private directory for one extraction job
+
+    Use as a context manager so the directory and everything in it is
+    removed however the job ends:
+
+        with JobWorkspace() as workspace:
+            path = workspace.file('media.mp4')
+    """
+
+    def __init__(self, root=None, quota_bytes=None):
+        self.root = root or default_workspace_root()
+        self.quota_bytes = quota_bytes if quota_bytes is not None else \
+            int(os.getenv('REEL_WORKSPACE_QUOTA_BYTES', DEFAULT_QUOTA_BYTES))
+        self.path = None
+
+    def open(self):
+        """Create the workspace directory"""
+        if self.path is None:
+            os.makedirs(self.root, exist_ok=True)
+            maybe_sweep(self.root)
+            self.path = tempfile.mkdtemp(prefix=WORKSPACE_PREFIX, dir=self.root)
+            # Record the owner so the janitor can tell live jobs from orphans
+            with open(os.path.join(self.path, OWNER_FILE), 'w') as f:
+                f.write(f"{os.getpid()} {time.time()}")
+        return self
+
+    def file(self, name):
+        """Path of a file inside the workspace"""
+        return os.path.join(self.open().path, name)
+
+    def usage(self):
+        """Bytes currently used by the workspace"""
+        total = 0
+        for dirpath, _, filenames in os.walk(self.path or ''):
+            for name in filenames:
+                try:
+                    total += os.path.getsize(os.path.join(dirpath, name))
+                except OSError:
+                    pass
+        return total
+
+    def check_quota(self):
+        """Raise QuotaExceeded if the job has written more than its quota"""
+        if self.quota_bytes and self.usage() > self.quota_bytes:
+            raise QuotaExceeded(f"Job workspace exceeded its {self.quota_bytes // 1048576} MB quota")
+
+    def cleanup(self):
+        """Remove the workspace and everything in it"""
+        if self.path:
+            shutil.rmtree(self.path, ignore_errors=True)
+            self.path = None
+
+    def __enter__(self):
+        return self.open()
+
+    def __exit__(self, exc_type, exc, tb):
+        self.cleanup()
+        return False
+
+
+def _owner_alive(pid):
+    """Check whether the process that created a workspace still exists"""
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except (PermissionError, OSError):
+        return True
+    return True
+
+
+def sweep_orphaned_workspaces(root=None, max_age=None):
+    """Remove workspaces whose owner died or that outlived max_age
+
+    Returns the number of workspaces removed.
+    """
+    root = root or default_workspace_root()
+    max_age = max_age if max_age is not None else int(os.getenv('REEL_WORKSPACE_MAX_AGE', DEFAULT_MAX_AGE))
+    removed = 0
+
+    try:
+        entries = list(os.scandir(root))
+    except OSError:
+        return 0
+
+    for entry in entries:
+        if not entry.name.startswith(WORKSPACE_PREFIX) or not entry.is_dir():
+            continue
+
+        try:
+            with open(os.path.join(entry.path, OWNER_FILE)) as f:
+                pid, created = f.read().split()
+            pid, created = int(pid), float(created)
+        except (OSError, ValueError):
+            # No owner marker - fall back to the directory age
+            try:
+                pid, created = None, entry.stat().st_mtime
+            except OSError:
+                continue
+
+        orphaned = time.time() - created > max_age or (pid is not None and not _owner_alive(pid))
+        if orphaned:
+            shutil.rmtree(entry.path, ignore_errors=True)
+            removed += 1
+
+    return removed
+
+
+def maybe_sweep(root=None):
+    """Run the janitor if it has not run recently in this process"""
+    global _last_sweep
+    now = time.time()
+    if now - _last_sweep < SWEEP_INTERVAL:
+        return 0
+    _last_sweep = now
+    return sweep_orphaned_workspaces(root)